@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 import utils
 import dag_engine
@@ -34,6 +35,189 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# --- UI Helpers ---
+# Static HTML snippets reused by every recovery card
+ARROW_HTML = "<h3 style='text-align: center; margin-top: 20px'>➡</h3>"
+SPACER_HTML = "<br>"
+
+def lazy_expander(title, key):
+    """
+    Creates a collapsed expander whose body only needs to be rendered when open.
+    Returns (container, is_open). Callers should skip building the body if is_open is False.
+    Falls back to a checkbox toggle on Streamlit versions without expander open-state tracking.
+    """
+    try:
+        exp = st.expander(title, expanded=False, key=key, on_change="rerun")
+        return exp, bool(exp.open)
+    except TypeError:
+        # Older Streamlit: expander has no key/on_change, so track open state ourselves
+        is_open = st.checkbox(f"Show details: {title}", key=f"open_{key}")
+        return st.expander(title, expanded=is_open), is_open
+
+def frame_hash(df):
+    """
+    Content hash of a DataFrame (column names + values, index ignored) for use as a cache key.
+    Returns None if the frame holds unhashable values, in which case callers should not cache.
+    """
+    try:
+        return hash((tuple(df.columns), pd.util.hash_pandas_object(df, index=False).values.tobytes()))
+    except TypeError:
+        return None
+
+def arrow_backed(df, cache_key):
+    """
+    Arrow-backed copy of a read-only display table, so st.dataframe can pass its buffers
+    to the frontend instead of converting object columns cell by cell.
+    Cached in session_state under cache_key until the frame's content changes.
+    Only for display: the engines expect numpy-backed frames (NaN, not pd.NA).
+    """
+    df_hash = frame_hash(df)
+    cached = st.session_state.get(cache_key)
+    if df_hash is not None and cached is not None and cached[0] == df_hash:
+        return cached[1]
+    try:
+        arrow_df = df.convert_dtypes(dtype_backend="pyarrow", convert_integer=False)
+    except (TypeError, ValueError):
+        return df
+    st.session_state[cache_key] = (df_hash, arrow_df)
+    return arrow_df
+
+# --- Static UI Content ---
+# Tooltips for calculated columns in the schedule tables (static, built once per process)
+SCHEDULE_COLUMN_CONFIG = {
+    "total_float_days": st.column_config.NumberColumn(
+        "Total Float ℹ️",
+        help="Total Float = LS - ES. Delay allowance before project finish is impacted."
+    ),
+    "on_critical_path": st.column_config.TextColumn(
+        "Critical?",
+        help="True if Total Float is zero (or minimal). These tasks drive the project finish date."
+    ),
+    "ES_date": st.column_config.DateColumn(
+        "Early Start",
+        help="Earliest date the activity can start based on predecessors."
+    ),
+    "EF_date": st.column_config.DateColumn(
+        "Early Finish",
+        help="Earliest date the activity can finish."
+    ),
+    "LS_date": st.column_config.DateColumn(
+        "Late Start",
+        help="Latest date the activity can start without delaying the project."
+    ),
+    "LF_date": st.column_config.DateColumn(
+        "Late Finish",
+        help="Latest date the activity can finish without delaying the project."
+    ),
+    "forecast_start_date": st.column_config.DateColumn(
+        "Forecast Start",
+        help="Projected start date based on actual progress and remaining duration."
+    ),
+    "forecast_finish_date": st.column_config.DateColumn(
+        "Forecast Finish",
+        help="Projected finish date based on actual progress and remaining duration."
+    ),
+    "remaining_duration_days": st.column_config.NumberColumn(
+        "Rem. Dur.",
+        help="Remaining work days calculated from Percent Complete or manual overrides."
+    ),
+    "planned_duration": st.column_config.NumberColumn(
+        "Planned Dur.",
+        help="Baseline duration from the schedule."
+    ),
+    "task_planned_effort": st.column_config.NumberColumn(
+        "Task Planned Effort",
+        help="Immutable effort anchor: planned_duration × resource_working_hours × fte_allocation. Used for resource swap calculations.",
+        format="%.1f hrs"
+    )
+}
+
+SCHEDULE_RECOVERY_LOGIC_MD = """
+**Enhanced Recovery Strategies:**
+
+1.  **🚀 Fast-Tracking (Parallel Processing)**
+    *   *Trigger*: Critical tasks waiting for a predecessor to Finish.
+    *   *Action*: Overlap tasks by changing dependency to **Start-to-Start (SS) + 2 days Lag**.
+    *   *Benefit*: Successor starts much earlier (only 2 days after predecessor starts), saving significant time.
+
+2.  **💥 Task Crashing (Aggressive)**
+    *   *Trigger*: Critical tasks needing immediate acceleration.
+    *   *Action*: **Double the FTE** (Overtime/Double Shift).
+    *   *Benefit*: Cuts duration in half but likely **overloads resources** and increases cost.
+
+3.  **📉 Duration Compression (Optimization)**
+    *   *Trigger*: Critical tasks that are Active or Planned but delayed.
+    *   *Action*: Reduce duration by up to **20%** (or 1 day min).
+    *   *Benefit*: Recovers time directly on the driving path. Matches well with resource addition.
+"""
+
+RESOURCE_RECOVERY_LOGIC_MD = """
+**Strict Conditions for Resource Swaps:**
+1.  **💰 Strictly Lower Cost**: `Candidate Rate < Current Rate` (Must save money).
+2.  **🧠 Skill Match (≥ 60%)**: Candidate must have >= 60% of required skills. (If 2 skills required, need both).
+3.  **📅 100% Availability**: Zero conflicting tasks in the current project schedule.
+4.  **🚧 Active Task**: Task must not be completed.
+
+**Strict Conditions for FTE Adjustments:**
+1.  **🚨 Critical Path**: Task must be on critical path.
+2.  **🔋 Capacity**: Current FTE < Max FTE.
+3.  **⏳ Active**: Remaining Duration > 0.
+"""
+
+COST_RECOVERY_LOGIC_MD = """
+**Condition for Scope Deferral:**
+*   **Trigger**: Activity flagged with significant **Cost Overrun** or **Risk**.
+*   **Rule**: Mark activity as 'Deferred' (Remaining Duration set to 0).
+*   **Goal**: Reduce projected spend by removing low-priority or high-risk scope from the immediate baseline.
+"""
+
+# Recovery workspace highlighting
+HIGHLIGHT_SOURCE = 'background-color: #ffeba1; color: black; font-weight: bold' # Light Orange for Action Source
+HIGHLIGHT_DIFF = 'background-color: #ffffdd; color: black'   # Light Yellow for Propagated Change
+# Schedule columns that feed cost_engine.calculate_costs (cost cache key for the workspace)
+COST_INPUT_COLS = [
+    "activity_id", "resource_id", "fte_allocation",
+    "planned_duration", "actual_duration", "remaining_duration_days"
+]
+# Styled tables are serialised cell by cell; larger workspaces style only this many rows by default
+STYLE_ROW_LIMIT = 500
+
+# Dates, float and criticality are recalculated whenever duration or logic changes
+_RECALC_COLS = [
+    "forecast_start_date", "forecast_finish_date",
+    "ES_date", "EF_date", "LS_date", "LF_date",
+    "total_float_days", "on_critical_path"
+]
+
+# Action Inputs (and their direct impacts) to highlight, by Action Type
+ACTION_SOURCE_COLS = {
+    recovery_engine.ACTION_FTE_ADJ: (
+        ["fte_allocation", "remaining_duration_days", "planned_duration"] + _RECALC_COLS
+        # Highlight Cost Impacts for FTE (User Req)
+        + ["remaining_cost", "eac_cost", "planned_cost", "remaining_load_hours"]
+    ),
+    recovery_engine.ACTION_CRASHING: (
+        ["fte_allocation", "remaining_duration_days", "planned_duration"] + _RECALC_COLS
+        + ["remaining_cost", "eac_cost", "remaining_load_hours"] # Cost/Overload impact
+    ),
+    recovery_engine.ACTION_COMPRESS: (
+        ["remaining_duration_days", "planned_duration"] + _RECALC_COLS
+        # Cost columns (already updated proportionally in apply_action, but highlight to show change)
+        + ["remaining_cost", "eac_cost", "remaining_load_hours"]
+    ),
+    recovery_engine.ACTION_RES_SWAP: (
+        ["resource_id", "resource_name", "cost_per_hour",
+         "remaining_duration_days", "planned_duration", # Duration recalculated from effort
+         "remaining_cost", "planned_cost", "remaining_load_hours"] # New rate * hours
+        + _RECALC_COLS
+    ),
+    recovery_engine.ACTION_FAST_TRACK: (
+        ["predecessors", "predecessor_id"] + _RECALC_COLS # Changed dependency
+        # Cost columns (may change if dates/duration change)
+        + ["remaining_cost", "eac_cost", "remaining_load_hours"]
+    ),
+}
+
 # --- Phase 2: Sidebar (Upload & Global Filters) ---
 st.sidebar.title("Input & Settings")
 
@@ -69,6 +253,11 @@ if 'generated_actions' not in st.session_state:
 if 'applied_actions' not in st.session_state:
     st.session_state['applied_actions'] = set()
 
+# Manual duration overrides by action id, kept apart from the widget keys because
+# Streamlit drops a widget's state while its (lazily rendered) card is collapsed
+if 'dur_overrides' not in st.session_state:
+    st.session_state['dur_overrides'] = {}
+
 # Load Schedule early to populate filters
 # First try uploaded files, then fall back to csv folder
 if uploaded_schedule:
@@ -96,6 +285,9 @@ elif os.path.exists("csv/resource_cost_unit.csv"):
     except Exception as e:
         st.sidebar.error(f"Error reading csv/resource_cost_unit.csv: {e}")
 
+# Normalize activity ids once so matching never has to coerce them per row
+df_schedule = utils.normalize_activity_ids(df_schedule)
+
 # --- Global Filters ---
 st.sidebar.subheader("3. Global Filters")
 
@@ -155,6 +347,8 @@ if st.sidebar.button("Run Analysis", type="primary"):
     st.session_state['recovery_schedule'] = None
     st.session_state['generated_actions'] = []
     st.session_state['applied_actions'] = set()
+    st.session_state['dur_overrides'] = {}
+    st.session_state['res_diag_cache'] = None
 
 # --- Validation & DAG Logic ---
 # Use filtered schedule for all analysis
@@ -241,17 +435,12 @@ if st.session_state['analyzed'] and df_schedule_filtered is not None:
                      # --- MVP 4: Forecasting ---
                      # Ensure we run this inside the no-cycle block
                      try:
-                         forecast_results = forecasting_engine.calculate_forecasts(df_schedule_filtered, dag_graph)
-                         fc_df = pd.DataFrame.from_dict(forecast_results, orient='index')
+                         fc_df = forecasting_engine.calculate_forecasts(df_schedule_filtered, dag_graph, as_frame=True)
                          
-                         fc_cols = ["percent_complete", "actual_duration", "baseline_1_duration", "remaining_duration_days",
-                                    "forecast_start_date", "forecast_finish_date", 
-                                    "delay_carried_in", "total_schedule_delay", 
-                                    "task_created_delay", "delay_absorbed"]
-                                    
-                         for col in fc_cols:
-                             if col in fc_df.columns:
-                                 df_schedule_filtered[col] = df_schedule_filtered["_temp_id"].map(fc_df[col])
+                         # Align all forecast columns to the schedule rows in one reindex
+                         aligned_fc = fc_df.reindex(df_schedule_filtered["_temp_id"].to_numpy())
+                         for col in forecasting_engine.FORECAST_COLUMNS:
+                             df_schedule_filtered[col] = aligned_fc[col].to_numpy()
                                  
                          # DEBUG: Verify Logic Update
                          max_delay_carry = 0
@@ -292,23 +481,34 @@ if st.session_state['analyzed'] and df_schedule_filtered is not None:
                              
                              # Calculate task_planned_effort (immutable anchor for resource swaps)
                              # task_planned_effort = planned_duration × resource_working_hours × fte_allocation
-                             def calculate_task_planned_effort(row):
-                                 plan_dur = float(row.get("planned_duration", 0)) if pd.notna(row.get("planned_duration")) else 0
-                                 fte = float(row.get("fte_allocation", 0)) if pd.notna(row.get("fte_allocation")) else 0
+                             # resource_working_hours by resource id (first row wins), built once instead of
+                             # filtering df_resource for every activity
+                             res_hours_col = df_resource["resource_working_hours"] if "resource_working_hours" in df_resource.columns else [8.0] * len(df_resource)
+                             hours_by_res = {}
+                             for rid_key, hours in zip(df_resource["resource_id"].astype(str), res_hours_col):
+                                 hours_by_res.setdefault(rid_key, hours)
+                             
+                             def calculate_task_planned_effort(plan_dur, fte, res_id):
+                                 plan_dur = float(plan_dur) if pd.notna(plan_dur) else 0
+                                 fte = float(fte) if pd.notna(fte) else 0
                                  
                                  # Look up resource_working_hours from df_resource
-                                 res_id = row.get("resource_id")
                                  work_hours = 8.0  # Default
-                                 if res_id and df_resource is not None:
-                                     res_row = df_resource[df_resource["resource_id"].astype(str) == str(res_id)]
-                                     if not res_row.empty:
-                                         work_hours = float(res_row.iloc[0].get("resource_working_hours", 8.0))
-                                         if pd.isna(work_hours) or work_hours == 0:
-                                             work_hours = 8.0
+                                 if res_id and str(res_id) in hours_by_res:
+                                     work_hours = float(hours_by_res[str(res_id)])
+                                     if pd.isna(work_hours) or work_hours == 0:
+                                         work_hours = 8.0
                                  
                                  return plan_dur * work_hours * fte
                              
-                             df_schedule_filtered["task_planned_effort"] = df_schedule_filtered.apply(calculate_task_planned_effort, axis=1)
+                             # Positional access: zip the three input columns rather than building a Series per row
+                             def sched_col(col):
+                                 return df_schedule_filtered[col] if col in df_schedule_filtered.columns else [None] * len(df_schedule_filtered)
+                             
+                             df_schedule_filtered["task_planned_effort"] = [
+                                 calculate_task_planned_effort(plan_dur, fte, res_id)
+                                 for plan_dur, fte, res_id in zip(sched_col("planned_duration"), sched_col("fte_allocation"), sched_col("resource_id"))
+                             ]
                                      
                              # Overload Check
                              resource_stats = cost_engine.check_resource_availability(cost_df_results)
@@ -637,24 +837,7 @@ with tabs[1]: # Schedule Recovery
         st.subheader("Schedule Recovery Actions")
         
         with st.expander("ℹ️ Understanding the Recovery Logic (Click to Expand)", expanded=False):
-            st.markdown("""
-            **Enhanced Recovery Strategies:**
-            
-            1.  **🚀 Fast-Tracking (Parallel Processing)**
-                *   *Trigger*: Critical tasks waiting for a predecessor to Finish.
-                *   *Action*: Overlap tasks by changing dependency to **Start-to-Start (SS) + 2 days Lag**.
-                *   *Benefit*: Successor starts much earlier (only 2 days after predecessor starts), saving significant time.
-
-            2.  **💥 Task Crashing (Aggressive)**
-                *   *Trigger*: Critical tasks needing immediate acceleration.
-                *   *Action*: **Double the FTE** (Overtime/Double Shift).
-                *   *Benefit*: Cuts duration in half but likely **overloads resources** and increases cost.
-
-            3.  **📉 Duration Compression (Optimization)**
-                *   *Trigger*: Critical tasks that are Active or Planned but delayed.
-                *   *Action*: Reduce duration by up to **20%** (or 1 day min).
-                *   *Benefit*: Recovers time directly on the driving path. Matches well with resource addition.
-            """)
+            st.markdown(SCHEDULE_RECOVERY_LOGIC_MD)
         
         # Filter Actions
         all_actions = st.session_state.get('generated_actions', [])
@@ -757,17 +940,12 @@ with tabs[1]: # Schedule Recovery
                                                 st.session_state['recovery_schedule'][col] = st.session_state['recovery_schedule']["_temp_id"].map(cpm_df_updated[col])
                                         
                                         # Recalculate Forecasting (which uses CPM dates and propagates delays)
-                                        forecast_results_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated)
-                                        fc_df_updated = pd.DataFrame.from_dict(forecast_results_updated, orient='index')
-                                        
-                                        fc_cols = ["percent_complete", "actual_duration", "baseline_1_duration", "remaining_duration_days",
-                                                   "forecast_start_date", "forecast_finish_date", 
-                                                   "delay_carried_in", "total_schedule_delay", 
-                                                   "task_created_delay", "delay_absorbed"]
+                                        fc_df_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated, as_frame=True)
                                         
-                                        for col in fc_cols:
-                                            if col in fc_df_updated.columns:
-                                                st.session_state['recovery_schedule'][col] = st.session_state['recovery_schedule']["_temp_id"].map(fc_df_updated[col])
+                                        # Align all forecast columns to the schedule rows in one reindex
+                                        aligned_fc = fc_df_updated.reindex(st.session_state['recovery_schedule']["_temp_id"].to_numpy())
+                                        for col in forecasting_engine.FORECAST_COLUMNS:
+                                            st.session_state['recovery_schedule'][col] = aligned_fc[col].to_numpy()
                                         
                                         # Clean up temp column
                                         if "_temp_id" in st.session_state['recovery_schedule'].columns:
@@ -908,17 +1086,12 @@ with tabs[1]: # Schedule Recovery
                                          
                                          # Recalculate Forecasting (which uses CPM dates and propagates delays)
                                          # Forecasting updates ALL tasks based on their dependencies - all linked tasks are updated
-                                         forecast_results_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated)
-                                         fc_df_updated = pd.DataFrame.from_dict(forecast_results_updated, orient='index')
+                                         fc_df_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated, as_frame=True)
                                          
-                                         fc_cols = ["percent_complete", "actual_duration", "baseline_1_duration", "remaining_duration_days",
-                                                    "forecast_start_date", "forecast_finish_date", 
-                                                    "delay_carried_in", "total_schedule_delay", 
-                                                    "task_created_delay", "delay_absorbed"]
-                                         
-                                         for col in fc_cols:
-                                             if col in fc_df_updated.columns:
-                                                 st.session_state['recovery_schedule'][col] = st.session_state['recovery_schedule']["_temp_id"].map(fc_df_updated[col])
+                                         # Align all forecast columns to the schedule rows in one reindex
+                                         aligned_fc = fc_df_updated.reindex(st.session_state['recovery_schedule']["_temp_id"].to_numpy())
+                                         for col in forecasting_engine.FORECAST_COLUMNS:
+                                             st.session_state['recovery_schedule'][col] = aligned_fc[col].to_numpy()
                                          
                                          # Recalculate Costs (duration changed, so costs need update)
                                          if df_resource is not None:
@@ -980,7 +1153,11 @@ with tabs[1]: # Schedule Recovery
                  # Expander Title
                  title = f"Project: {project_name} | Activity ID: {act_id} | Critical Path | {delay_in:.0f}d delay carried in | Remaining duration > {remaining_dur:.0f}"
                  
-                 with st.expander(title, expanded=False):
+                 # Only build the card body when the user has it open
+                 exp, exp_open = lazy_expander(title, key=f"exp_{action_id}")
+                 if not exp_open:
+                     continue
+                 with exp:
                     # Row 1: Narrative
                     if "narrative" in action:
                         st.warning(action["narrative"])
@@ -1001,13 +1178,20 @@ with tabs[1]: # Schedule Recovery
                     # Default to recommended (Old - Rec)
                     def_new = max(1, int(old_dur - rec_red))
                     
-                    # We use a key based on action_id to persist input state
+                    # The widget state is lost while the card is collapsed, so the override
+                    # lives in dur_overrides and seeds the input each time it is rendered
+                    def_new = min(max(1, st.session_state['dur_overrides'].get(action_id, def_new)), int(old_dur))
+
+                    def save_dur_override(action_id=action_id):
+                        st.session_state['dur_overrides'][action_id] = st.session_state[f"num_dur_{action_id}"]
+
                     new_dur_input = c3.number_input(
                         "New Duration (Days)", 
                         min_value=1, 
                         max_value=int(old_dur),
                         value=def_new,
                         key=f"num_dur_{action_id}",
+                        on_change=save_dur_override,
                         disabled=is_applied,
                         help="Manually override the new duration found by the engine."
                     )
@@ -1020,21 +1204,14 @@ with tabs[1]: # Schedule Recovery
                     # Check graph for successors
                     dag = st.session_state.get('dag_graph_active')
                     if dag:
-                        try:
-                            # Ensure ID type match (int vs str)
-                            node_id = act_id
-                            if node_id not in dag.nodes:
-                                 try: node_id = int(act_id)
-                                 except: pass
-                                 
-                            if node_id in dag.nodes:
-                                succs = list(dag.successors(node_id))
-                                if succs:
-                                    st.markdown(f"**📉 Impact Preview:** Modifying this task will affect **{len(succs)}** immediate successors: *{', '.join(map(str, succs[:5]))}{'...' if len(succs)>5 else ''}*")
-                                else:
-                                    st.caption("No immediate successors found.")
-                        except Exception as e:
-                            pass
+                        # Node id is coerced to the DAG's type when the action is generated
+                        node_id = params.get('_node_id', act_id)
+                        if node_id in dag.nodes:
+                            succs = list(dag.successors(node_id))
+                            if succs:
+                                st.markdown(f"**📉 Impact Preview:** Modifying this task will affect **{len(succs)}** immediate successors: *{', '.join(map(str, succs[:5]))}{'...' if len(succs)>5 else ''}*")
+                            else:
+                                st.caption("No immediate successors found.")
 
                     st.divider()
 
@@ -1111,17 +1288,12 @@ with tabs[1]: # Schedule Recovery
                                                     st.session_state['recovery_schedule'][col] = st.session_state['recovery_schedule']["_temp_id"].map(cpm_df_updated[col])
                                         
                                         # Recalculate Forecasting (which uses CPM dates and propagates delays)
-                                        forecast_results_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated)
-                                        fc_df_updated = pd.DataFrame.from_dict(forecast_results_updated, orient='index')
-                                        
-                                        fc_cols = ["percent_complete", "actual_duration", "baseline_1_duration", "remaining_duration_days",
-                                                   "forecast_start_date", "forecast_finish_date", 
-                                                   "delay_carried_in", "total_schedule_delay", 
-                                                   "task_created_delay", "delay_absorbed"]
+                                        fc_df_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated, as_frame=True)
                                         
-                                        for col in fc_cols:
-                                            if col in fc_df_updated.columns:
-                                                st.session_state['recovery_schedule'][col] = st.session_state['recovery_schedule']["_temp_id"].map(fc_df_updated[col])
+                                        # Align all forecast columns to the schedule rows in one reindex
+                                        aligned_fc = fc_df_updated.reindex(st.session_state['recovery_schedule']["_temp_id"].to_numpy())
+                                        for col in forecasting_engine.FORECAST_COLUMNS:
+                                            st.session_state['recovery_schedule'][col] = aligned_fc[col].to_numpy()
                                         
                                         # Clean up temp column
                                         if "_temp_id" in st.session_state['recovery_schedule'].columns:
@@ -1173,53 +1345,96 @@ with tabs[2]: # Resource Recovery
         # We need to scan df_schedule or cost_df_results to find assignments for this resource
         # cost_df_results has 'resource_id' and 'activity_id'.
         
-        # Create map: details = { 'RES_1': ['Act A', 'Act B'] }
-        res_activity_map = {}
-        if not cost_df_results.empty:
-            for rid, grp in cost_df_results.groupby("resource_id"):
-                res_activity_map[str(rid)] = grp["activity_id"].unique().tolist()
+        # Diagnostics reflect the baseline analysis, so applying recovery actions
+        # does not change them. Reuse the last table unless the inputs changed:
+        # the filters, the overload stats, and the contents of the tables the names,
+        # assignments and project ids are read from (a re-upload does not clear the cache).
+        def cols_hash(df, cols):
+            cols = [c for c in cols if c in df.columns] if df is not None else []
+            if not cols:
+                return (len(df) if df is not None else None,) # Nothing to read from it
+            return frame_hash(df[cols])
+        
+        input_hashes = (
+            cols_hash(df_resource, list(df_resource.columns) if df_resource is not None else []),
+            cols_hash(cost_df_results, ["resource_id", "activity_id"]),
+            cols_hash(df_schedule, ["activity_id", "project_id"])
+        )
+        res_diag_sig = None
+        if None not in input_hashes: # Unhashable contents: rebuild every run
+            res_diag_sig = (
+                portfolio_filter, project_filter, activity_filter,
+                tuple((rid, stats.get("peak_fte", 0), stats.get("overload_days_count", 0)) for rid, stats in resource_stats.items()),
+                input_hashes
+            )
+        res_diag_cache = st.session_state.get('res_diag_cache')
+        if res_diag_sig is not None and res_diag_cache and res_diag_cache[0] == res_diag_sig:
+            _, res_diag_df, total_overloads, full_assignments = res_diag_cache
+        else:
+            # Create map: details = { 'RES_1': ['Act A', 'Act B'] }
+            res_activity_map = {}
+            if not cost_df_results.empty:
+                for rid, grp in cost_df_results.groupby("resource_id"):
+                    res_activity_map[str(rid)] = grp["activity_id"].unique().tolist()
         
-        res_data = []
-        for rid, stats in resource_stats.items():
-            peak = stats.get("peak_fte", 0)
-            overload = stats.get("overload_days_count", 0)
-            assignments = res_activity_map.get(str(rid), [])
-            # Truncate if too long
-            assign_str = ", ".join(map(str, assignments))
-
-            # Lookup Project IDs for these activities
-            # assignments contains activity_ids. 
-            # We filter df_schedule for these IDs and get unique project_ids.
-            proj_str = ""
-            if assignments and df_schedule is not None:
-                # Ensure activity_id is string or matching type
-                # assignments likely from cost engine which might use string or int
-                rel_df = df_schedule[df_schedule["activity_id"].astype(str).isin([str(x) for x in assignments])]
-                if "project_id" in rel_df.columns:
-                    unique_projs = rel_df["project_id"].dropna().unique()
-                    proj_str = ", ".join(map(str, unique_projs))
+            res_data = []
+            full_assignments = {}  # Resource ID -> full list, for the lists truncated in the table
+            total_overloads = 0  # Accumulated here instead of re-summing the table
+            for rid, stats in resource_stats.items():
+                peak = stats.get("peak_fte", 0)
+                overload = stats.get("overload_days_count", 0)
+                total_overloads += overload
+                assignments = res_activity_map.get(str(rid), [])
+                # Truncate if too long (only the preview is sent to the browser)
+                assign_str = ", ".join(map(str, assignments[:5])) + ("..." if len(assignments) > 5 else "")
+                if len(assignments) > 5:
+                    full_assignments[rid] = assignments
+
+                # Lookup Project IDs for these activities
+                # assignments contains activity_ids. 
+                # We filter df_schedule for these IDs and get unique project_ids.
+                proj_str = ""
+                if assignments and df_schedule is not None:
+                    # Ensure activity_id is string or matching type
+                    # assignments likely from cost engine which might use string or int
+                    rel_df = df_schedule[df_schedule["activity_id"].astype(str).isin([str(x) for x in assignments])]
+                    if "project_id" in rel_df.columns:
+                        unique_projs = rel_df["project_id"].dropna().unique()
+                        proj_str = ", ".join(map(str, unique_projs))
             
-            # Lookup Resource Name
-            r_name = "Unknown"
-            if df_resource is not None:
-                # Ensure type match for lookup
-                r_row = df_resource[df_resource["resource_id"].astype(str) == str(rid)]
-                if not r_row.empty:
-                    r_name = r_row.iloc[0].get("resource_name", "Unknown")
-
-            res_data.append({
-                "Resource ID": rid,
-                "Resource Name": r_name,
-                "Project ID": proj_str,
-                "Peak Assigned FTE": peak,
-                "Overload Days": overload,
-                "Assigned Activities": assign_str
-            })
+                # Lookup Resource Name
+                r_name = "Unknown"
+                if df_resource is not None:
+                    # Ensure type match for lookup
+                    r_row = df_resource[df_resource["resource_id"].astype(str) == str(rid)]
+                    if not r_row.empty:
+                        r_name = r_row.iloc[0].get("resource_name", "Unknown")
+
+                res_data.append({
+                    "Resource ID": rid,
+                    "Resource Name": r_name,
+                    "Project ID": proj_str,
+                    "Peak Assigned FTE": peak,
+                    "Overload Days": overload,
+                    "Assigned (count)": len(assignments),
+                    "Assigned Activities": assign_str
+                })
             
-        res_diag_df = pd.DataFrame(res_data)
-        st.dataframe(res_diag_df, use_container_width=True)
+            res_diag_df = pd.DataFrame(res_data)
+            st.session_state['res_diag_cache'] = (res_diag_sig, res_diag_df, total_overloads, full_assignments)
+
+        st.dataframe(res_diag_df, use_container_width=True, hide_index=True)
+
+        # Full assignment lists are kept out of the table and only sent when asked for
+        if full_assignments:
+            sel_col, list_col = st.columns([2, 1])
+            with sel_col:
+                full_rid = st.selectbox("Resource with truncated assignments:", list(full_assignments.keys()), key="res_diag_full_rid")
+            with list_col:
+                st.markdown(SPACER_HTML, unsafe_allow_html=True)
+                with st.popover(f"All {len(full_assignments[full_rid])} activities"):
+                    st.markdown(", ".join(map(str, full_assignments[full_rid])))
         
-        total_overloads = res_diag_df["Overload Days"].sum()
         st.metric("Total Resource Overload Days", f"{total_overloads} days")
         
         st.divider()
@@ -1227,18 +1442,7 @@ with tabs[2]: # Resource Recovery
         st.subheader("Resource Recovery Options")
         
         with st.expander("ℹ️ Understanding the Recovery Logic (Click to Expand)"):
-            st.markdown("""
-            **Strict Conditions for Resource Swaps:**
-            1.  **💰 Strictly Lower Cost**: `Candidate Rate < Current Rate` (Must save money).
-            2.  **🧠 Skill Match (≥ 60%)**: Candidate must have >= 60% of required skills. (If 2 skills required, need both).
-            3.  **📅 100% Availability**: Zero conflicting tasks in the current project schedule.
-            4.  **🚧 Active Task**: Task must not be completed.
-
-            **Strict Conditions for FTE Adjustments:**
-            1.  **🚨 Critical Path**: Task must be on critical path.
-            2.  **🔋 Capacity**: Current FTE < Max FTE.
-            3.  **⏳ Active**: Remaining Duration > 0.
-            """)
+            st.markdown(RESOURCE_RECOVERY_LOGIC_MD)
         
         all_res_actions = st.session_state.get('generated_actions', [])
         
@@ -1253,7 +1457,11 @@ with tabs[2]: # Resource Recovery
         if swaps:
             for i, action in enumerate(swaps):
                 # Card Styling
-                with st.expander(f"{action.get('project_name')} | {action.get('resource_name')} (Swap Opportunity)", expanded=False):
+                # Only build the card body when the user has it open
+                exp, exp_open = lazy_expander(f"{action.get('project_name')} | {action.get('resource_name')} (Swap Opportunity)", key=f"exp_{action.get('id')}")
+                if not exp_open:
+                    continue
+                with exp:
                     
                     # 1. Narrative Story
                     if "narrative" in action:
@@ -1271,7 +1479,7 @@ with tabs[2]: # Resource Recovery
                         st.text("Status: Allocated")
                         
                     with c2:
-                        st.markdown("<h3 style='text-align: center; margin-top: 20px'>➡</h3>", unsafe_allow_html=True)
+                        st.markdown(ARROW_HTML, unsafe_allow_html=True)
                         
                     with c3:
                         st.markdown("**🟢 After (Proposed)**")
@@ -1365,17 +1573,12 @@ with tabs[2]: # Resource Recovery
                                          
                                          # Recalculate Forecasting (which uses CPM dates and propagates delays)
                                          # Forecasting updates ALL tasks based on their dependencies - all linked tasks are updated
-                                         forecast_results_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated)
-                                         fc_df_updated = pd.DataFrame.from_dict(forecast_results_updated, orient='index')
+                                         fc_df_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated, as_frame=True)
                                          
-                                         fc_cols = ["percent_complete", "actual_duration", "baseline_1_duration", "remaining_duration_days",
-                                                    "forecast_start_date", "forecast_finish_date", 
-                                                    "delay_carried_in", "total_schedule_delay", 
-                                                    "task_created_delay", "delay_absorbed"]
-                                         
-                                         for col in fc_cols:
-                                             if col in fc_df_updated.columns:
-                                                 st.session_state['recovery_schedule'][col] = st.session_state['recovery_schedule']["_temp_id"].map(fc_df_updated[col])
+                                         # Align all forecast columns to the schedule rows in one reindex
+                                         aligned_fc = fc_df_updated.reindex(st.session_state['recovery_schedule']["_temp_id"].to_numpy())
+                                         for col in forecasting_engine.FORECAST_COLUMNS:
+                                             st.session_state['recovery_schedule'][col] = aligned_fc[col].to_numpy()
                                          
                                          # Recalculate Costs (duration changed, so costs need update)
                                          if df_resource is not None:
@@ -1409,7 +1612,11 @@ with tabs[2]: # Resource Recovery
         if fte_adjs:
             for i, action in enumerate(fte_adjs):
                 # Header Format
-                with st.expander(f"{action.get('project_name')} | {action.get('resource_name')} (Critical Path Recovery)", expanded=False):
+                # Only build the card body when the user has it open
+                exp, exp_open = lazy_expander(f"{action.get('project_name')} | {action.get('resource_name')} (Critical Path Recovery)", key=f"exp_{action.get('id')}")
+                if not exp_open:
+                    continue
+                with exp:
                     
                     # 1. Narrative
                     if "narrative" in action:
@@ -1425,7 +1632,7 @@ with tabs[2]: # Resource Recovery
                         st.metric("Duration", f"{p.get('old_dur'):.1f} Days")
                         
                     with c2:
-                         st.markdown("<h3 style='text-align: center; margin-top: 20px'>➡</h3>", unsafe_allow_html=True)
+                         st.markdown(ARROW_HTML, unsafe_allow_html=True)
 
                     with c3:
                         st.markdown("**🚀 Optimized Allocation**")
@@ -1443,59 +1650,20 @@ with tabs[2]: # Resource Recovery
                             st.metric("📅 Recovered", f"{p.get('saved_days'):.1f} Days", delta="Time Saved")
                         with col2:
                             cost_impact = p.get('cost_impact', 0)
-                            old_fte = p.get('old_fte', 0)
-                            new_fte = p.get('new_fte', 0)
-                            old_dur = p.get('old_dur', 0)
-                            new_dur = p.get('new_dur', 0)
-                            rate = p.get('resource_rate', 0)
-                            work_hours = p.get('work_hours', 8)
-                            old_cost = p.get('old_cost', 0)
-                            new_cost = p.get('new_cost', 0)
-                            
-                            # Calculate total hours for display
-                            old_total_hours = old_dur * old_fte * work_hours
-                            new_total_hours = new_dur * new_fte * work_hours
                             
                             # Show cost impact with tooltip
-                            if abs(cost_impact) > 0.01:  # Only show if significant difference
-                                metric_col, help_col = st.columns([0.9, 0.1])
-                                with metric_col:
+                            metric_col, help_col = st.columns([0.9, 0.1])
+                            with metric_col:
+                                if abs(cost_impact) > 0.01:  # Only show if significant difference
                                     st.metric("💰 Cost Impact", f"${cost_impact:,.2f}", delta="Cost Change", delta_color="inverse" if cost_impact > 0 else "normal")
-                                with help_col:
-                                    st.markdown("<br>", unsafe_allow_html=True)
-                                    with st.popover("ℹ️"):
-                                        st.markdown("**Cost Calculation Details**")
-                                        st.markdown("**Scenario:**")
-                                        st.markdown(f"- **Old:** {old_dur:.1f} days × {old_fte} FTE = {old_total_hours:.1f} total hours")
-                                        st.markdown(f"- **New:** {new_dur:.1f} days × {new_fte} FTE = {new_total_hours:.1f} total hours")
-                                        st.markdown("")
-                                        st.markdown("**Cost Calculation:**")
-                                        st.markdown(f"- **Old Cost:** {old_dur:.1f} days × {work_hours:.1f} hrs/day × {old_fte} FTE × ${rate:.2f}/hr = **${old_cost:,.2f}**")
-                                        st.markdown(f"- **New Cost:** {new_dur:.1f} days × {work_hours:.1f} hrs/day × {new_fte} FTE × ${rate:.2f}/hr = **${new_cost:,.2f}**")
-                                        st.markdown(f"- **Cost Difference:** **${cost_impact:,.2f}**")
-                            else:
-                                # Cost remains same (total hours unchanged, just burned faster)
-                                metric_col, help_col = st.columns([0.9, 0.1])
-                                with metric_col:
+                                else:
+                                    # Cost remains same (total hours unchanged, just burned faster)
                                     st.metric("💰 Cost Impact", "Same", delta="Total hours unchanged")
-                                with help_col:
-                                    st.markdown("<br>", unsafe_allow_html=True)
-                                    with st.popover("ℹ️"):
-                                        st.markdown("**Cost Calculation Details**")
-                                        st.markdown("**Scenario:**")
-                                        st.markdown(f"- **Old:** {old_dur:.1f} days × {old_fte} FTE = {old_total_hours:.1f} total hours")
-                                        st.markdown(f"- **New:** {new_dur:.1f} days × {new_fte} FTE = {new_total_hours:.1f} total hours")
-                                        st.markdown("")
-                                        st.markdown("**Cost Calculation:**")
-                                        st.markdown(f"- **Old Cost:** {old_dur:.1f} days × {work_hours:.1f} hrs/day × {old_fte} FTE × ${rate:.2f}/hr = **${old_cost:,.2f}**")
-                                        st.markdown(f"- **New Cost:** {new_dur:.1f} days × {work_hours:.1f} hrs/day × {new_fte} FTE × ${rate:.2f}/hr = **${new_cost:,.2f}**")
-                                        st.markdown(f"- **Cost Difference:** **${cost_impact:,.2f}**")
-                                        st.markdown("")
-                                        st.markdown("**Why Cost Stays the Same:**")
-                                        st.markdown("When FTE increases and duration decreases proportionally:")
-                                        st.markdown(f"- Total hours worked remain the same ({old_total_hours:.1f} hours in both cases)")
-                                        st.markdown("- You're doing the same work, just faster")
-                                        st.markdown("- Cost = Hours × Rate, so cost stays the same")
+                            with help_col:
+                                st.markdown(SPACER_HTML, unsafe_allow_html=True)
+                                with st.popover("ℹ️"):
+                                    # Breakdown text is precomputed once in recovery_engine.generate_actions
+                                    st.markdown(p.get('_popover_md', ""))
                         
                     with cf2:
                          st.write("")
@@ -1574,17 +1742,12 @@ with tabs[2]: # Resource Recovery
                                           
                                           # Recalculate Forecasting (which uses CPM dates and propagates delays)
                                           # Forecasting updates ALL tasks based on their dependencies - all linked tasks are updated
-                                          forecast_results_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated)
-                                          fc_df_updated = pd.DataFrame.from_dict(forecast_results_updated, orient='index')
-                                          
-                                          fc_cols = ["percent_complete", "actual_duration", "baseline_1_duration", "remaining_duration_days",
-                                                     "forecast_start_date", "forecast_finish_date", 
-                                                     "delay_carried_in", "total_schedule_delay", 
-                                                     "task_created_delay", "delay_absorbed"]
+                                          fc_df_updated = forecasting_engine.calculate_forecasts(st.session_state['recovery_schedule'], dag_graph_updated, as_frame=True)
                                           
-                                          for col in fc_cols:
-                                              if col in fc_df_updated.columns:
-                                                  st.session_state['recovery_schedule'][col] = st.session_state['recovery_schedule']["_temp_id"].map(fc_df_updated[col])
+                                          # Align all forecast columns to the schedule rows in one reindex
+                                          aligned_fc = fc_df_updated.reindex(st.session_state['recovery_schedule']["_temp_id"].to_numpy())
+                                          for col in forecasting_engine.FORECAST_COLUMNS:
+                                              st.session_state['recovery_schedule'][col] = aligned_fc[col].to_numpy()
                                           
                                           # Recalculate Costs (duration changed, so costs need update)
                                           if df_resource is not None:
@@ -1680,12 +1843,7 @@ with tabs[3]: # Cost Recovery
         st.subheader("Cost Recovery Actions")
         
         with st.expander("ℹ️ Understanding the Recovery Logic (Click to Expand)"):
-            st.markdown("""
-            **Condition for Scope Deferral:**
-            *   **Trigger**: Activity flagged with significant **Cost Overrun** or **Risk**.
-            *   **Rule**: Mark activity as 'Deferred' (Remaining Duration set to 0).
-            *   **Goal**: Reduce projected spend by removing low-priority or high-risk scope from the immediate baseline.
-            """)
+            st.markdown(COST_RECOVERY_LOGIC_MD)
         
         cost_actions = [a for a in st.session_state.get('generated_actions', []) 
                         if a['type'] == recovery_engine.ACTION_DEFERRAL]
@@ -1758,8 +1916,36 @@ with tabs[4]: # EVM
                 total_remaining_cost = 0.0
                 
                 status_date = pd.Timestamp.now().date()
+                status_day = np.datetime64(status_date, 'D')
+                
+                # PV time-elapsed fraction for every row at once (same rules as evm_engine):
+                # dates are parsed once and compared as datetime64[D], not per row.
+                # Rows with blank or unreadable planned dates carry no PV (NaN fraction).
+                def plan_days(col):
+                    if col not in df_schedule.columns:
+                        return np.full(len(df_schedule), np.datetime64("NaT"), dtype="datetime64[D]")
+                    raw = df_schedule[col]
+                    dates = pd.to_datetime(raw, errors="coerce", format="ISO8601")
+                    retry = dates.isna() & raw.notna()
+                    if retry.any():
+                        dates[retry] = pd.to_datetime(raw[retry], errors="coerce", format="mixed")
+                    return dates.to_numpy().astype("datetime64[D]")
                 
-                for _, row in df_schedule.iterrows():
+                start_days = plan_days("planned_start")
+                finish_days = plan_days("planned_finish")
+                dated = ~(np.isnat(start_days) | np.isnat(finish_days))
+                total_durs = np.zeros(len(df_schedule), dtype=int)
+                total_durs[dated] = (np.busday_count(start_days[dated], finish_days[dated], weekmask='1111100')
+                                     + np.is_busday(finish_days[dated], weekmask='1111100'))
+                so_far = np.busday_count(start_days[dated], status_day, weekmask='1111100') + np.is_busday(status_day, weekmask='1111100')
+                elapsed = np.zeros(len(df_schedule), dtype=int)
+                elapsed[dated] = np.where(status_day >= finish_days[dated], total_durs[dated],
+                                          np.where(status_day < start_days[dated], 0, so_far))
+                pv_fractions = np.full(len(df_schedule), np.nan)
+                pv_fractions[dated] = np.where(total_durs[dated] > 0, elapsed[dated] / np.maximum(total_durs[dated], 1),
+                                               (elapsed[dated] > 0).astype(float))
+                
+                for pos, (_, row) in enumerate(df_schedule.iterrows()):
                     planned_cost = row.get("planned_cost", 0) if pd.notna(row.get("planned_cost")) else 0
                     actual_cost = row.get("actual_cost", 0) if pd.notna(row.get("actual_cost")) else 0
                     remaining_cost = row.get("remaining_cost", 0) if pd.notna(row.get("remaining_cost")) else 0
@@ -1783,28 +1969,13 @@ with tabs[4]: # EVM
                         breakdown["EV"]["details"].append(f"Activity {act_id}: ${planned_cost:,.2f} × {pct_comp*100:.1f}% = ${ev_contrib:,.2f}")
                     
                     # PV
-                    p_start = row.get("planned_start")
-                    p_finish = row.get("planned_finish")
-                    if pd.notna(p_start) and pd.notna(p_finish):
-                        try:
-                            total_dur = forecasting_engine.count_working_days(p_start, p_finish, inclusive=True)
-                            s_date_str = status_date.isoformat()
-                            
-                            if s_date_str >= str(p_finish):
-                                elapsed = total_dur
-                            elif s_date_str < str(p_start):
-                                elapsed = 0
-                            else:
-                                elapsed = forecasting_engine.count_working_days(p_start, s_date_str, inclusive=True)
-                            
-                            fraction = elapsed / total_dur if total_dur > 0 else (1.0 if elapsed > 0 else 0.0)
-                            pv_contrib = planned_cost * fraction
-                            total_pv += pv_contrib
-                            
-                            if planned_cost > 0:
-                                breakdown["PV"]["details"].append(f"Activity {act_id}: ${planned_cost:,.2f} × {fraction*100:.1f}% (elapsed/total days) = ${pv_contrib:,.2f}")
-                        except:
-                            pass
+                    fraction = pv_fractions[pos]
+                    if not np.isnan(fraction):
+                        pv_contrib = planned_cost * fraction
+                        total_pv += pv_contrib
+                        
+                        if planned_cost > 0:
+                            breakdown["PV"]["details"].append(f"Activity {act_id}: ${planned_cost:,.2f} × {fraction*100:.1f}% (elapsed/total days) = ${pv_contrib:,.2f}")
                     
                     total_remaining_cost += remaining_cost
                 
@@ -2046,249 +2217,79 @@ with tabs[5]: # Project Data
     #     if st.session_state.get('recovery_schedule') is not None:
     #         st.write(st.session_state['recovery_schedule'].dtypes.astype(str))
     
-    # Define Tooltips for Calculated Columns
-    column_config = {
-        "total_float_days": st.column_config.NumberColumn(
-            "Total Float ℹ️",
-            help="Total Float = LS - ES. Delay allowance before project finish is impacted."
-        ),
-        "on_critical_path": st.column_config.TextColumn(
-            "Critical?",
-            help="True if Total Float is zero (or minimal). These tasks drive the project finish date."
-        ),
-        "ES_date": st.column_config.DateColumn(
-            "Early Start",
-            help="Earliest date the activity can start based on predecessors."
-        ),
-        "EF_date": st.column_config.DateColumn(
-            "Early Finish",
-            help="Earliest date the activity can finish."
-        ),
-        "LS_date": st.column_config.DateColumn(
-            "Late Start",
-            help="Latest date the activity can start without delaying the project."
-        ),
-         "LF_date": st.column_config.DateColumn(
-            "Late Finish",
-            help="Latest date the activity can finish without delaying the project."
-        ),
-        "forecast_start_date": st.column_config.DateColumn(
-            "Forecast Start",
-            help="Projected start date based on actual progress and remaining duration."
-        ),
-         "forecast_finish_date": st.column_config.DateColumn(
-            "Forecast Finish",
-            help="Projected finish date based on actual progress and remaining duration."
-        ),
-        "remaining_duration_days": st.column_config.NumberColumn(
-            "Rem. Dur.",
-            help="Remaining work days calculated from Percent Complete or manual overrides."
-        ),
-        "planned_duration": st.column_config.NumberColumn(
-            "Planned Dur.",
-            help="Baseline duration from the schedule."
-        ),
-        "task_planned_effort": st.column_config.NumberColumn(
-            "Task Planned Effort",
-            help="Immutable effort anchor: planned_duration × resource_working_hours × fte_allocation. Used for resource swap calculations.",
-            format="%.1f hrs"
-        )
-    }
-    
     # Show Recovery Workspace if active
     if st.session_state.get('recovery_schedule') is not None:
         st.info("Displaying RECOVERY WORKSPACE (Includes applied changes).")
         
-        # Helper for styling
-        # Since we can't easily iterate styles row by row efficiently without Styler which returns Styler obj,
-        # we will use st.dataframe(styler).
-        def highlight_changes(row):
+        # Styles for the whole workspace in one pass (Styler.apply with axis=None).
+        # User said "only highlight particular cell which changed". i'll stick to that.
+        def highlight_changes(df):
             # Default style (no highlight)
-            styles = [''] * len(row)
+            styles = pd.DataFrame('', index=df.index, columns=df.columns)
             
             # --- 1. Identify Source of Change (Action Metadata) ---
-            lct = str(row.get("last_change_type", "None"))
-                
-            highlight_source = 'background-color: #ffeba1; color: black; font-weight: bold' # Light Orange for Action Source
-            highlight_diff = 'background-color: #ffffdd; color: black'   # Light Yellow for Propagated Change
+            if "last_change_type" in df.columns:
+                # Encode once so each action type is an integer code comparison
+                lct = pd.Categorical(df["last_change_type"].astype(str))
+                for action_type, cols in ACTION_SOURCE_COLS.items():
+                    if action_type not in lct.categories:
+                        continue
+                    rows = lct.codes == lct.categories.get_loc(action_type)
+                    cols = [c for c in cols if c in styles.columns]
+                    if cols:
+                        styles.loc[rows, cols] = HIGHLIGHT_SOURCE
             
-            # Helper to mark col
-            def mark_col(col_name, style):
-                try:
-                    idx = row.index.get_loc(col_name)
-                    styles[idx] = style
-                except KeyError:
-                    pass
-            
-            # Highlight Action Inputs based on Type
-            # Highlight Action Inputs based on Type
-            if lct == recovery_engine.ACTION_FTE_ADJ:
-                mark_col("fte_allocation", highlight_source)
-                mark_col("remaining_duration_days", highlight_source)
-                mark_col("planned_duration", highlight_source)
-                # Dates will change when duration changes
-                mark_col("forecast_start_date", highlight_source)
-                mark_col("forecast_finish_date", highlight_source)
-                mark_col("ES_date", highlight_source)
-                mark_col("EF_date", highlight_source)
-                mark_col("LS_date", highlight_source)
-                mark_col("LF_date", highlight_source)
-                mark_col("total_float_days", highlight_source)
-                mark_col("on_critical_path", highlight_source)
-                # Highlight Cost Impacts for FTE (User Req)
-                mark_col("remaining_cost", highlight_source)
-                mark_col("eac_cost", highlight_source)
-                mark_col("planned_cost", highlight_source)
-                mark_col("remaining_load_hours", highlight_source)
-            elif lct == recovery_engine.ACTION_CRASHING:
-                mark_col("fte_allocation", highlight_source) # Changed field
-                mark_col("remaining_duration_days", highlight_source)
-                mark_col("planned_duration", highlight_source)
-                # Dates will change when duration changes
-                mark_col("forecast_start_date", highlight_source)
-                mark_col("forecast_finish_date", highlight_source)
-                mark_col("ES_date", highlight_source)
-                mark_col("EF_date", highlight_source)
-                mark_col("LS_date", highlight_source)
-                mark_col("LF_date", highlight_source)
-                mark_col("total_float_days", highlight_source)
-                mark_col("on_critical_path", highlight_source)
-                mark_col("remaining_cost", highlight_source) # Cost/Overload impact
-                mark_col("eac_cost", highlight_source)
-                mark_col("remaining_load_hours", highlight_source)
-            elif lct == recovery_engine.ACTION_COMPRESS:
-                mark_col("remaining_duration_days", highlight_source)
-                mark_col("planned_duration", highlight_source)
-                # Dates will change when duration is compressed
-                mark_col("forecast_start_date", highlight_source)
-                mark_col("forecast_finish_date", highlight_source)
-                mark_col("ES_date", highlight_source)
-                mark_col("EF_date", highlight_source)
-                mark_col("LS_date", highlight_source)
-                mark_col("LF_date", highlight_source)
-                mark_col("total_float_days", highlight_source)
-                mark_col("on_critical_path", highlight_source)
-                # Cost columns (already updated proportionally in apply_action, but highlight to show change)
-                mark_col("remaining_cost", highlight_source)
-                mark_col("eac_cost", highlight_source)
-                mark_col("remaining_load_hours", highlight_source)
-            elif lct == recovery_engine.ACTION_RES_SWAP:
-                mark_col("resource_id", highlight_source) # Important
-                mark_col("resource_name", highlight_source)
-                mark_col("cost_per_hour", highlight_source)
-                mark_col("remaining_duration_days", highlight_source) # Duration recalculated from effort
-                mark_col("planned_duration", highlight_source) # Duration recalculated from effort
-                mark_col("remaining_cost", highlight_source) # Cost savings
-                mark_col("planned_cost", highlight_source) # New Rate * Planned Hours
-                mark_col("remaining_load_hours", highlight_source) # Load hours updated
-                # Dates will be recalculated due to duration change
-                mark_col("forecast_start_date", highlight_source)
-                mark_col("forecast_finish_date", highlight_source)
-                mark_col("ES_date", highlight_source)
-                mark_col("EF_date", highlight_source)
-                mark_col("LS_date", highlight_source)
-                mark_col("LF_date", highlight_source)
-                mark_col("total_float_days", highlight_source)
-                mark_col("on_critical_path", highlight_source)
-            elif lct == recovery_engine.ACTION_FAST_TRACK:
-                mark_col("predecessors", highlight_source) # Changed dependency
-                mark_col("predecessor_id", highlight_source) # Changed dependency
-                # Dates will be recalculated due to dependency change
-                mark_col("forecast_start_date", highlight_source)
-                mark_col("forecast_finish_date", highlight_source)
-                mark_col("ES_date", highlight_source)
-                mark_col("EF_date", highlight_source)
-                mark_col("LS_date", highlight_source)
-                mark_col("LF_date", highlight_source)
-                mark_col("total_float_days", highlight_source)
-                mark_col("on_critical_path", highlight_source)
-                # Cost columns (may change if dates/duration change)
-                mark_col("remaining_cost", highlight_source)
-                mark_col("eac_cost", highlight_source)
-                mark_col("remaining_load_hours", highlight_source)
-
             # --- 2. Generic Diff vs Baseline (Propagation) ---
-            # Compare this row against the original df_schedule
-            # We assume df_schedule is available in local scope (it is, from top of script)
-            if df_schedule is not None:
-                try:
-                    # Find baseline row by activity_id
-                    # Optimization: create lookup dict outside if slow, but for MVP:
-                    act_id = float(row["activity_id"])
-                    
-                    # Ensure types match
-                    # baseline might have int index or activity_id column
-                    # Let's filter
-                    base_row = df_schedule[df_schedule["activity_id"] == act_id]
-                    
-                    if not base_row.empty:
-                        base_row = base_row.iloc[0]
-                        
-                        # Columns to check for diffs (Expanded to cover ALL recalculations)
-                        check_cols = [
-                            "remaining_duration_days", "planned_duration",
-                            "planned_finish", "ES_date", "EF_date", "LS_date", "LF_date", 
-                            "forecast_finish_date", "forecast_start_date",
-                            "remaining_cost", "eac_cost", "planned_cost", "actual_cost",
-                            "remaining_load_hours", "planned_load_hours", "actual_load_hours",
-                            "total_float_days"
-                        ]
-                        
-                        for col in check_cols:
-                            if col in row and col in base_row:
-                                val_new = row[col]
-                                val_old = base_row[col]
-                                
-                                # Compare
-                                is_diff = False
-                                try:
-                                    # Normalize for comparison
-                                    v1 = str(val_new).strip().lower().replace(".0", "")
-                                    v2 = str(val_old).strip().lower().replace(".0", "")
-                                    if v1 != v2 and v1 != "nan" and v1 != "none":
-                                        is_diff = True
-                                except:
-                                    pass
-                                
-                                if is_diff:
-                                    # Don't overwrite Source Highlight
-                                    curr_style = styles[row.index.get_loc(col)]
-                                    if not curr_style:
-                                        mark_col(col, highlight_diff)
-
-                except Exception as e:
-                    pass
-            
-            # User said "only highlight particular cell which changed". i'll stick to that.
-            
-            return styles
+            # Don't overwrite Source Highlight
+            diff = diff_mask.reindex(index=df.index, columns=df.columns, fill_value=False)
+            return styles.mask(diff & (styles == ''), HIGHLIGHT_DIFF)
 
-        rec_df = st.session_state['recovery_schedule'].copy()
+        # Shallow copy: only whole columns are replaced/added below, never written in place,
+        # so the workspace in session_state is left untouched without duplicating its data.
+        rec_df = st.session_state['recovery_schedule'].copy(deep=False)
         
         # Recalculate costs for recovery schedule if resource data is available
         if df_resource is not None:
             try:
-                cost_df_results = cost_engine.calculate_costs(rec_df, df_resource)
+                # Reuse the last result while neither the cost inputs nor the resource data have changed.
+                # Only the columns calculate_costs reads from the schedule are hashed, so schedule-only
+                # changes (e.g. Fast-Tracking rewrites predecessors) don't trigger a recalculation.
+                cost_input_cols = [c for c in COST_INPUT_COLS if c in rec_df.columns]
+                cost_key = (frame_hash(rec_df[cost_input_cols]), frame_hash(df_resource))
+                last_cost = st.session_state.get('last_cost')
+                if None not in cost_key and last_cost is not None and last_cost[0] == cost_key:
+                    cost_df_results = last_cost[1]
+                else:
+                    # calculate_costs adds a _rid column to the frame it is given; hand it the
+                    # projection so rec_df (and the table below) is the same on hits and misses
+                    cost_df_results = cost_engine.calculate_costs(rec_df[cost_input_cols], df_resource)
+                    st.session_state['last_cost'] = (cost_key, cost_df_results)
                 cost_lookup = cost_df_results.set_index("activity_id")
                 
                 cost_cols = ["planned_load_hours", "planned_cost", "actual_load_hours", 
                              "actual_cost", "remaining_load_hours", "remaining_cost", "eac_cost"]
                 
+                # Align all cost columns to the workspace rows in one reindex
+                cost_cols = [col for col in cost_cols if col in cost_lookup.columns]
+                aligned_costs = cost_lookup[cost_cols].reindex(rec_df["activity_id"].to_numpy())
                 for col in cost_cols:
-                    if col in cost_lookup.columns:
-                        rec_df[col] = rec_df["activity_id"].map(cost_lookup[col])
+                    rec_df[col] = aligned_costs[col].to_numpy()
             except Exception as ce:
                 st.warning(f"Cost recalculation error: {ce}")
         
         # Debug: Check if any changes exist
-        changes_count = rec_df["last_change_type"].notna().sum()
+        changed_rows = rec_df["last_change_type"].notna().to_numpy()
+        changes_count = changed_rows.sum()
         if changes_count > 0:
             st.success(f"{changes_count} changes applied in Recovery Workspace. Highlighted below.")
             
             # Show Audit Table
             with st.expander("View Change Log (Audit Trail)", expanded=True):
-                 # Filter only changed rows
-                 audit_df = rec_df[rec_df["last_change_type"].notna()][["activity_id", "last_change_type", "last_change_id", "resource_id", "remaining_duration_days"]]
+                 # Filter only changed rows (single .loc: row mask and column projection together)
+                 audit_df = rec_df.loc[
+                     changed_rows,
+                     ["activity_id", "last_change_type", "last_change_id", "resource_id", "remaining_duration_days"]
+                 ]
                  st.dataframe(audit_df, use_container_width=True)
         else:
             st.info("No changes applied yet. Workspace matches Baseline.")
@@ -2298,16 +2299,56 @@ with tabs[5]: # Project Data
             st.session_state['recovery_schedule'] = recovery_engine.init_recovery_workspace(df_schedule)
             st.rerun()
 
-        # Apply style
+        # Diff the workspace against the baseline once for highlight_changes.
+        # Columns to check for diffs (Expanded to cover ALL recalculations)
+        check_cols = [
+            "remaining_duration_days", "planned_duration",
+            "planned_finish", "ES_date", "EF_date", "LS_date", "LF_date", 
+            "forecast_finish_date", "forecast_start_date",
+            "remaining_cost", "eac_cost", "planned_cost", "actual_cost",
+            "remaining_load_hours", "planned_load_hours", "actual_load_hours",
+            "total_float_days"
+        ]
+        diff_mask = pd.DataFrame(False, index=rec_df.index, columns=[])
+        if df_schedule is not None:
+            diff_cols = [c for c in check_cols if c in df_schedule.columns and c in rec_df.columns]
+            
+            # Align baseline rows to the workspace by numeric activity_id
+            base_keys = pd.to_numeric(df_schedule["activity_id"], errors="coerce")
+            base_df = df_schedule[base_keys.notna() & ~base_keys.duplicated()]
+            base_df = base_df.set_index(base_keys[base_df.index])[diff_cols]
+            rec_keys = pd.to_numeric(rec_df["activity_id"], errors="coerce")
+            has_base = rec_keys.isin(base_df.index).to_numpy()
+            aligned = base_df.reindex(rec_keys.to_numpy())
+            
+            diff_mask = pd.DataFrame(False, index=rec_df.index, columns=diff_cols)
+            for col in diff_cols:
+                new_vals = rec_df[col]
+                old_vals = aligned[col].set_axis(rec_df.index)
+                # Numbers compare with a tolerance, everything else as trimmed text
+                new_num = pd.to_numeric(new_vals, errors="coerce")
+                old_num = pd.to_numeric(old_vals, errors="coerce")
+                both_num = new_num.notna() & old_num.notna()
+                num_diff = both_num & ~np.isclose(new_num.fillna(0), old_num.fillna(0))
+                txt_diff = ~both_num & (new_vals.astype(str).str.strip() != old_vals.astype(str).str.strip())
+                diff_mask[col] = has_base & new_vals.notna() & (num_diff | txt_diff)
+
+        # Apply style (first STYLE_ROW_LIMIT rows unless the user asks for the full table)
+        style_full = len(rec_df) <= STYLE_ROW_LIMIT or st.checkbox("Style full table (slower)", key="style_full_workspace")
+        styled_df = rec_df if style_full else rec_df.head(STYLE_ROW_LIMIT)
         try:
              st.dataframe(
-                 rec_df.style.apply(highlight_changes, axis=1), 
+                 styled_df.style.apply(highlight_changes, axis=None), 
                  use_container_width=True,
-                 column_config=column_config
+                 column_config=SCHEDULE_COLUMN_CONFIG
              )
         except Exception as e:
              st.warning(f"Could not apply styling: {e}")
-             st.dataframe(rec_df, use_container_width=True)
+             st.dataframe(styled_df, use_container_width=True)
+        
+        if not style_full:
+             st.caption(f"Highlighting shown for the first {STYLE_ROW_LIMIT} rows. Remaining rows below are unstyled.")
+             st.dataframe(rec_df.iloc[STYLE_ROW_LIMIT:], use_container_width=True, column_config=SCHEDULE_COLUMN_CONFIG)
              
         st.caption(f"Rows: {len(rec_df)} | Columns: {len(rec_df.columns)}")
             
@@ -2338,7 +2379,7 @@ with tabs[5]: # Project Data
         """)
 
     if df_schedule is not None:
-        st.dataframe(df_schedule, use_container_width=True, column_config=column_config)
+        st.dataframe(arrow_backed(df_schedule, 'arrow_schedule'), use_container_width=True, column_config=SCHEDULE_COLUMN_CONFIG)
         st.caption(f"Rows: {len(df_schedule)} | Columns: {len(df_schedule.columns)}")
     else:
         st.info("Please upload 'project_schedule.csv' in the sidebar.")
@@ -2346,7 +2387,7 @@ with tabs[5]: # Project Data
 with tabs[6]: # Resource Data
     st.subheader("Resource Cost & Unit Data")
     if df_resource is not None:
-        st.dataframe(df_resource, use_container_width=True)
+        st.dataframe(arrow_backed(df_resource, 'arrow_resource'), use_container_width=True)
         st.caption(f"Rows: {len(df_resource)} | Columns: {len(df_resource.columns)}")
     else:
         st.info("Please upload 'resource_cost_unit.csv' in the sidebar.")
@@ -13,21 +13,17 @@ def calculate_costs(df_schedule, df_resource):
         return df_schedule, {}
 
     # Cast to str for join safely. Handle floats (1.0 -> 1) and whitespace.
-    def clean_key(val):
-        if pd.isna(val) or val == "":
-            return "UNKNOWN"
-        s = str(val).strip()
+    # Works on the whole column so the parsing runs in pandas, not per cell.
+    def clean_keys(col):
+        s = col.astype(str).str.strip()
         # If looks like float "1.0", convert to int then str
-        try:
-            val_f = float(s)
-            if val_f.is_integer():
-                return str(int(val_f))
-        except:
-            pass
-        return s
+        num = pd.to_numeric(s, errors="coerce")
+        is_int = np.isfinite(num) & (num == np.floor(num)) & (num.abs() < 2**63)
+        s = s.mask(is_int, num[is_int].astype("int64").astype(str))
+        return s.mask(col.isna() | (col == ""), "UNKNOWN")
 
-    df_schedule["_rid"] = df_schedule["resource_id"].map(clean_key)
-    df_resource["_rid"] = df_resource["resource_id"].map(clean_key)
+    df_schedule["_rid"] = clean_keys(df_schedule["resource_id"])
+    df_resource["_rid"] = clean_keys(df_resource["resource_id"])
     
     # DEDUP: Ensure unique Activity IDs to prevent double counting
     if "activity_id" in df_schedule.columns:
@@ -41,64 +37,62 @@ def calculate_costs(df_schedule, df_resource):
     
     # Calculate Metrics
     # planned_load_hours = planned_duration * resource_working_hours * fte
-    # handle NaNs -> 0
+    # handle NaNs -> 0 (whole columns at once, blanks and junk coerce to 0)
     
-    def get_col(row, col):
-        val = row.get(col)
-        if pd.isna(val) or val == "":
-            return 0
-        return float(val)
+    def num_col(col):
+        if col not in merged.columns:
+            return np.zeros(len(merged))
+        return pd.to_numeric(merged[col], errors="coerce").fillna(0).to_numpy(dtype=float)
 
-    results = []
+    def raw_col(col):
+        if col not in merged.columns:
+            return None
+        return merged[col].to_numpy()
+
+    # Get inputs
+    plan_dur = num_col("planned_duration")
+    act_dur = num_col("actual_duration")
+    rem_dur = num_col("remaining_duration_days")
     
-    for _, row in merged.iterrows():
-        # Get inputs
-        plan_dur = get_col(row, "planned_duration")
-        act_dur = get_col(row, "actual_duration")
-        rem_dur = get_col(row, "remaining_duration_days")
-        
-        fte = get_col(row, "fte_allocation")
-        # Resource cols might have different names based on merge or source
-        # In utils.py: "resource_rate", "resource_max_fte", "resource_start_date"
-        # "resource_working_hours" is validated in app.py but not in REQUIRED_COLUMNS_RESOURCE.
-        # Assuming it is present in csv.
-        
-        rate = get_col(row, "resource_rate")
-        work_hours = get_col(row, "resource_working_hours") # Need to ensure this exists in CSV/Utils logic
-        
-        # Logic
-        planned_load = plan_dur * work_hours * fte
-        planned_cost = planned_load * rate
-        
-        actual_load = act_dur * work_hours * fte
-        actual_cost = actual_load * rate
-        
-        remaining_load = rem_dur * work_hours * fte
-        remaining_cost = remaining_load * rate
-        
-        eac_cost = actual_cost + remaining_cost
-        
-        res_dict = {
-            "activity_id": row["activity_id"],
-            "planned_load_hours": planned_load,
-            "planned_cost": planned_cost,
-            "actual_load_hours": actual_load,
-            "actual_cost": actual_cost,
-            "remaining_load_hours": remaining_load,
-            "remaining_cost": remaining_cost,
-            "eac_cost": eac_cost,
-            "resource_id": row["resource_id"], # Keep for aggregation
-            # Pass through for overload check
-            "forecast_start_date": row.get("forecast_start_date"),
-            "forecast_finish_date": row.get("forecast_finish_date"),
-            "fte_allocation": fte,
-            "resource_max_fte": get_col(row, "resource_max_fte"),
-            "resource_start_date": row.get("resource_start_date"), 
-            "resource_end_date": row.get("resource_end_date")
-        }
-        results.append(res_dict)
-        
-    return pd.DataFrame(results)
+    fte = num_col("fte_allocation")
+    # Resource cols might have different names based on merge or source
+    # In utils.py: "resource_rate", "resource_max_fte", "resource_start_date"
+    # "resource_working_hours" is validated in app.py but not in REQUIRED_COLUMNS_RESOURCE.
+    # Assuming it is present in csv.
+    
+    rate = num_col("resource_rate")
+    work_hours = num_col("resource_working_hours") # Need to ensure this exists in CSV/Utils logic
+    
+    # Logic
+    planned_load = plan_dur * work_hours * fte
+    planned_cost = planned_load * rate
+    
+    actual_load = act_dur * work_hours * fte
+    actual_cost = actual_load * rate
+    
+    remaining_load = rem_dur * work_hours * fte
+    remaining_cost = remaining_load * rate
+    
+    eac_cost = actual_cost + remaining_cost
+    
+    return pd.DataFrame({
+        "activity_id": raw_col("activity_id"),
+        "planned_load_hours": planned_load,
+        "planned_cost": planned_cost,
+        "actual_load_hours": actual_load,
+        "actual_cost": actual_cost,
+        "remaining_load_hours": remaining_load,
+        "remaining_cost": remaining_cost,
+        "eac_cost": eac_cost,
+        "resource_id": raw_col("resource_id"), # Keep for aggregation
+        # Pass through for overload check
+        "forecast_start_date": raw_col("forecast_start_date"),
+        "forecast_finish_date": raw_col("forecast_finish_date"),
+        "fte_allocation": fte,
+        "resource_max_fte": num_col("resource_max_fte"),
+        "resource_start_date": raw_col("resource_start_date"), 
+        "resource_end_date": raw_col("resource_end_date")
+    })
 
 def check_resource_availability(cost_df):
     """
@@ -114,67 +108,81 @@ def check_resource_availability(cost_df):
     """
     resource_stats = {}
     
-    # Filter only rows with valid dates and forecast dates
-    # We iterate cost_df
+    if cost_df.empty or "resource_id" not in cost_df.columns:
+        return resource_stats
+    if "forecast_start_date" not in cost_df.columns or "forecast_finish_date" not in cost_df.columns:
+        return resource_stats
     
-    # Store daily usage: { res_id: { date_str: total_fte } }
-    daily_usage = {}
+    # Skip rows without a real resource
+    rids = cost_df["resource_id"]
+    cost_df = cost_df[~(rids.isna() | (rids == 0) | (rids == "0"))]
     
-    # Store max capacity: { res_id: max_fte }
-    res_caps = {}
+    # Encode resource ids once as integer codes (first-appearance order);
+    # all grouping below works on the codes instead of the raw id objects.
+    codes, res_ids = pd.factorize(cost_df["resource_id"])
+    res_ids = res_ids.tolist()
+    _, first_rows = np.unique(codes, return_index=True)
+    
+    # Store max capacity per resource code (first row seen for each resource)
+    # FTE implies Full Time Equivalent. 1.0 = 1 Person.
+    # User said "resource_max_fte" in CSV.
+    if "resource_max_fte" in cost_df.columns:
+        res_caps = pd.to_numeric(cost_df["resource_max_fte"].iloc[first_rows], errors="coerce").to_numpy(dtype=float)
+    else:
+        res_caps = np.full(len(res_ids), 8.0)
+    res_caps[res_caps == 0] = 1.0 # Safety
+    
+    # Parse forecast dates once per column. ISO strings take the fast path;
+    # anything else falls back to per-value parsing like bdate_range would.
+    def parse_days(col):
+        days = pd.to_datetime(col, errors="coerce", format="ISO8601")
+        retry = days.isna() & col.notna()
+        if retry.any():
+            days[retry] = pd.to_datetime(col[retry], errors="coerce", format="mixed")
+        return days.dt.normalize()
+    
+    start = parse_days(cost_df["forecast_start_date"])
+    finish = parse_days(cost_df["forecast_finish_date"])
+    valid = (start.notna() & finish.notna()).to_numpy()
+    
+    # Resources keep an entry (possibly with no working days) once they have a dated task
+    active_codes = pd.unique(codes[valid])
+    if len(active_codes) == 0:
+        return resource_stats
+    
+    # Expand tasks to Business Days: count per row, then offset from each row's first working day
+    start_d = start[valid].to_numpy().astype("datetime64[D]")
+    finish_d = finish[valid].to_numpy().astype("datetime64[D]")
+    counts = np.maximum(np.busday_count(start_d, finish_d + np.timedelta64(1, "D")), 0)
+    first_day = np.busday_offset(start_d, 0, roll="forward")
+    row_pos = np.repeat(np.arange(len(counts)), counts)
+    day_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    
+    if "fte_allocation" in cost_df.columns:
+        fte = pd.to_numeric(cost_df["fte_allocation"], errors="coerce").fillna(0).to_numpy()
+    else:
+        fte = np.zeros(len(cost_df))
+    daily_usage = pd.DataFrame({
+        "code": codes[valid][row_pos],
+        "date": np.busday_offset(first_day[row_pos], day_offsets, roll="forward"),
+        "fte": fte[valid][row_pos]
+    }).groupby(["code", "date"], sort=False)["fte"].sum()
     
-    for _, row in cost_df.iterrows():
-        rid = row.get("resource_id")
-        if pd.isna(rid) or rid == 0 or rid == "0":
-            continue
-            
-        max_fte = row.get("resource_max_fte", 8.0) # Default? Or 1.0? Usually 1.0 or 8h. 
-        # FTE implies Full Time Equivalent. 1.0 = 1 Person.
-        # User said "resource_max_fte" in CSV.
-        
-        if rid not in res_caps:
-            res_caps[rid] = max_fte
-            
-        # Expand dates
-        start = row.get("forecast_start_date")
-        finish = row.get("forecast_finish_date")
-        fte = row.get("fte_allocation", 0)
-        
-        if pd.isna(start) or pd.isna(finish):
-            continue
-            
-        try:
-            # Generate Business Days range
-            dates = pd.bdate_range(start=start, end=finish)
-            
-            if rid not in daily_usage:
-                daily_usage[rid] = {}
-                
-            for d in dates:
-                d_str = d.strftime('%Y-%m-%d')
-                if d_str not in daily_usage[rid]:
-                    daily_usage[rid][d_str] = 0
-                daily_usage[rid][d_str] += fte
-                
-        except:
-            continue
-
     # Analyze Overloads
-    for rid, usage_map in daily_usage.items():
-        max_cap = res_caps.get(rid, 1.0)
-        if max_cap == 0: max_cap = 1.0 # Safety
-        
-        overloads = 0
-        peak = 0
-        
-        for day, total_fte in usage_map.items():
-            if total_fte > max_cap:
-                overloads += 1
-            if total_fte > peak:
-                peak = total_fte
-                
-        resource_stats[rid] = {
-            "overload_days_count": overloads,
+    daily_codes = daily_usage.index.get_level_values("code").to_numpy()
+    daily_fte = daily_usage.to_numpy()
+    overloads = np.bincount(daily_codes, weights=daily_fte > res_caps[daily_codes], minlength=len(res_ids))
+    busy_days = np.bincount(daily_codes, minlength=len(res_ids))
+    peaks = np.full(len(res_ids), -np.inf)
+    np.maximum.at(peaks, daily_codes, daily_fte)
+    
+    for code in active_codes:
+        overload_days, peak = 0, 0
+        if busy_days[code]:
+            overload_days = int(overloads[code])
+            peak = max(float(peaks[code]), 0)
+        resource_stats[res_ids[code]] = {
+            "overload_days_count": overload_days,
             "peak_fte": peak,
             # "daily_assigned_fte": usage_map # Can be heavy, maybe omit?
         }
@@ -1,7 +1,23 @@
+import functools
 import numpy as np
 import pandas as pd
 import networkx as nx
 
+def _parse_dates(col):
+    """
+    Parses a date column to datetime64. Returns (dates, invalid) where invalid
+    marks values that pd.to_datetime rejects (blanks just become NaT).
+    """
+    dates = pd.to_datetime(col, errors="coerce", format="ISO8601")
+    invalid = pd.Series(False, index=col.index)
+    # Retry anything the fast path could not read, one value at a time
+    for idx in col.index[dates.isna() & col.notna()]:
+        try:
+            dates[idx] = pd.to_datetime(col[idx])
+        except (ValueError, TypeError):
+            invalid[idx] = True
+    return dates, invalid
+
 def calculate_durations(df):
     """
     Calculates duration in business days (Mon-Fri).
@@ -9,60 +25,171 @@ def calculate_durations(df):
     Falls back to calculating from planned_start and planned_finish dates.
     Returns a dict mapping activity_id -> duration (int).
     """
-    durations = {}
-    for _, row in df.iterrows():
-        try:
-            act_id = int(row["activity_id"])
-            
-            # Priority 1: Use planned_duration if available and valid
-            if "planned_duration" in row and pd.notna(row["planned_duration"]):
-                try:
-                    dur_val = float(row["planned_duration"])
-                    if dur_val > 0:
-                        durations[act_id] = int(dur_val)
-                        continue
-                except (ValueError, TypeError):
-                    pass
-            
-            # Priority 2: Use remaining_duration_days if available and valid
-            if "remaining_duration_days" in row and pd.notna(row["remaining_duration_days"]):
-                try:
-                    dur_val = float(row["remaining_duration_days"])
-                    if dur_val > 0:
-                        durations[act_id] = int(dur_val)
-                        continue
-                except (ValueError, TypeError):
-                    pass
-            
-            # Priority 3: Fall back to calculating from dates
-            start = pd.to_datetime(row["planned_start"])
-            finish = pd.to_datetime(row["planned_finish"])
-            
-            if pd.isna(start) or pd.isna(finish):
-                durations[act_id] = 0
+    if df.empty:
+        return {}
+    
+    # Invalid IDs are skipped
+    act_ids = pd.to_numeric(df["activity_id"], errors="coerce")
+    keep = act_ids.notna().to_numpy()
+    
+    def positive_days(col):
+        if col not in df.columns:
+            return np.full(len(df), np.nan)
+        vals = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        return np.where(vals > 0, np.trunc(vals), np.nan)
+    
+    # Priority 1: planned_duration, Priority 2: remaining_duration_days (when > 0)
+    durs = positive_days("planned_duration")
+    durs = np.where(np.isnan(durs), positive_days("remaining_duration_days"), durs)
+    
+    # Priority 3: Fall back to calculating from dates
+    need_dates = np.isnan(durs) & keep
+    if need_dates.any():
+        rows = df[need_dates]
+        start, bad_start = _parse_dates(rows["planned_start"])
+        finish, bad_finish = _parse_dates(rows["planned_finish"])
+        
+        # Rows with unreadable dates are skipped; missing dates give 0
+        keep[need_dates] = ~(bad_start | bad_finish).to_numpy()
+        has_dates = (start.notna() & finish.notna()).to_numpy()
+        
+        # Convert to numpy datetime64[D]
+        # We assume finish is inclusive. Add 1 day to finish for exclusive upper bound
+        start_np = start.to_numpy().astype("datetime64[D]")
+        finish_exclusive = finish.to_numpy().astype("datetime64[D]") + np.timedelta64(1, "D")
+        
+        calc = np.zeros(len(rows))
+        calc[has_dates] = np.busday_count(start_np[has_dates], finish_exclusive[has_dates])
+        durs[need_dates] = calc
+    
+    return dict(zip(
+        act_ids.to_numpy()[keep].astype(np.int64).tolist(),
+        durs[keep].astype(np.int64).tolist()
+    ))
+
+# Dependency type codes used in the packed graph arrays
+DEP_TYPE_CODES = {"FS": 0, "SS": 1, "FF": 2, "SF": 3}
+
+def _pack_graph(G, order, adjacency):
+    """
+    Packs one side of the graph (G.pred or G.succ) into CSR-style flat lists
+    indexed by position in `order`: (indptr, indices, type_codes, lags).
+    Unknown dependency types get code -1 and are ignored by the passes.
+    """
+    index = {n: i for i, n in enumerate(order)}
+    indptr = [0]
+    indices, type_codes, lags = [], [], []
+    for node in order:
+        for other, edge in adjacency[node].items():
+            indices.append(index[other])
+            type_codes.append(DEP_TYPE_CODES.get(edge.get("type", "FS"), -1))
+            lags.append(edge.get("lag", 0))
+        indptr.append(len(indices))
+    return indptr, indices, type_codes, lags
+
+def _forward_pass(indptr, indices, type_codes, lags, dur):
+    """
+    ES/EF for nodes in topological order from the packed predecessor lists.
+    """
+    n = len(dur)
+    es = [0] * n
+    ef = [0] * n
+    for i in range(n):
+        duration = dur[i]
+        node_es = None
+        for k in range(indptr[i], indptr[i + 1]):
+            p = indices[k]
+            code = type_codes[k]
+            # FS: ES >= pred_EF + lag
+            if code == 0:
+                c = ef[p] + lags[k]
+            # SS: ES >= pred_ES + lag
+            elif code == 1:
+                c = es[p] + lags[k]
+            # FF: EF >= pred_EF + lag => ES >= pred_EF + lag - dur
+            elif code == 2:
+                c = ef[p] + lags[k] - duration
+            # SF: EF >= pred_ES + lag => ES >= pred_ES + lag - dur
+            elif code == 3:
+                c = es[p] + lags[k] - duration
+            else:
                 continue
-                
-            # Convert to numpy datetime64[D]
-            start_np = np.datetime64(start, 'D')
-            finish_np = np.datetime64(finish, 'D')
-            
-            # Check for invalid dates
-            if np.isnat(start_np) or np.isnat(finish_np):
-                durations[act_id] = 0
+            if node_es is None or c > node_es:
+                node_es = c
+        # Default start is 0. Negative ES from lags is kept raw.
+        if node_es is None:
+            node_es = 0
+        es[i] = node_es
+        ef[i] = node_es + duration
+    return es, ef
+
+def _backward_pass(indptr, indices, type_codes, lags, dur, project_finish):
+    """
+    LS/LF for nodes in topological order from the packed successor lists.
+    Every constraint is expressed on LF (LS = LF - Duration).
+    """
+    n = len(dur)
+    ls = [project_finish] * n
+    lf = [project_finish] * n
+    for i in range(n - 1, -1, -1):
+        duration = dur[i]
+        node_lf = None
+        for k in range(indptr[i], indptr[i + 1]):
+            s = indices[k]
+            code = type_codes[k]
+            # FS: my LF <= succ_LS - lag
+            if code == 0:
+                c = ls[s] - lags[k]
+            # SS: my LS <= succ_LS - lag => LF <= succ_LS - lag + dur
+            elif code == 1:
+                c = ls[s] - lags[k] + duration
+            # FF: my LF <= succ_LF - lag
+            elif code == 2:
+                c = lf[s] - lags[k]
+            # SF: my LS <= succ_LF - lag => LF <= succ_LF - lag + dur
+            elif code == 3:
+                c = lf[s] - lags[k] + duration
+            else:
                 continue
+            if node_lf is None or c < node_lf:
+                node_lf = c
+        # Sinks (or nodes with no usable constraint) finish with the project
+        if node_lf is None:
+            node_lf = project_finish
+        lf[i] = node_lf
+        ls[i] = node_lf - duration
+    return ls, lf
 
-            # We assume finish is inclusive.
-            # Add 1 day to finish for exclusive upper bound
-            finish_exclusive = finish_np + np.timedelta64(1, 'D')
-            
-            duration = np.busday_count(start_np, finish_exclusive)
-            durations[act_id] = int(duration)
-            
-        except (ValueError, TypeError):
-            # Invalid ID or dates
-            continue
-            
-    return durations
+def _forward_pass_fs0(indptr, indices, dur):
+    """
+    _forward_pass specialised for graphs whose links are all FS with zero lag:
+    ES is simply the latest predecessor EF.
+    """
+    n = len(dur)
+    es = [0] * n
+    ef = [0] * n
+    for i in range(n):
+        node_es = 0
+        if indptr[i] < indptr[i + 1]:
+            node_es = max([ef[p] for p in indices[indptr[i]:indptr[i + 1]]])
+        es[i] = node_es
+        ef[i] = node_es + dur[i]
+    return es, ef
+
+def _backward_pass_fs0(indptr, indices, dur, project_finish):
+    """
+    _backward_pass specialised for all-FS, zero-lag graphs: LF is the earliest successor LS.
+    """
+    n = len(dur)
+    ls = [project_finish] * n
+    lf = [project_finish] * n
+    for i in range(n - 1, -1, -1):
+        node_lf = project_finish
+        if indptr[i] < indptr[i + 1]:
+            node_lf = min([ls[s] for s in indices[indptr[i]:indptr[i + 1]]])
+        lf[i] = node_lf
+        ls[i] = node_lf - dur[i]
+    return ls, lf
 
 def run_cpm(df, G):
     """
@@ -71,6 +198,26 @@ def run_cpm(df, G):
     """
     durations = calculate_durations(df)
     
+    # Results depend only on the nodes, the dependency edges and the durations,
+    # so identical inputs (e.g. Streamlit reruns) are served from the cache.
+    nodes = tuple(G.nodes)
+    edges = tuple((u, v, data.get("type", "FS"), data.get("lag", 0)) for u, v, data in G.edges(data=True))
+    dur_key = tuple(durations.get(node, 0) for node in nodes)
+    
+    # Copy per call: callers enrich the per-activity dicts in place
+    results = _run_cpm_cached(nodes, edges, dur_key)
+    return {node: dict(data) for node, data in results.items()}
+
+@functools.lru_cache(maxsize=32)
+def _run_cpm_cached(nodes, edges, dur_key):
+    """
+    CPM passes on a hashable description of the graph (see run_cpm).
+    """
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from((u, v, {"type": dep_type, "lag": lag}) for u, v, dep_type, lag in edges)
+    durations = dict(zip(nodes, dur_key))
+    
     # Check if DAG
     if not nx.is_directed_acyclic_graph(G):
         raise ValueError("Graph contains cycles. CPM cannot be calculated.")
@@ -78,166 +225,43 @@ def run_cpm(df, G):
     # Topo sort
     topo_order = list(nx.topological_sort(G))
     
+    # Project Duration
+    if not topo_order:
+        return {}
+    
+    # Pack the graph once so both passes work on flat integer-indexed lists
+    # instead of networkx adjacency lookups per edge.
+    dur = [durations.get(node, 0) for node in topo_order]
+    
     # --- Forward Pass ---
     # ES, EF are relative integer days from Project Start (Day 0)
-    # We treat min_start as Day 0?
-    # Actually, standard CPM just calculates relative offsets.
+    # End = Start + Duration (Exclusive End), so FS means Start >= Finish.
+    # Most schedules only use plain FS links; those skip the dependency-type dispatch.
+    fs_only = all(dep_type == "FS" and type(lag) is int and lag == 0 for _, _, dep_type, lag in edges)
+    pred_graph = _pack_graph(G, topo_order, G.pred)
+    if fs_only:
+        es, ef = _forward_pass_fs0(pred_graph[0], pred_graph[1], dur)
+    else:
+        es, ef = _forward_pass(*pred_graph, dur)
     
-    es = {n: 0 for n in G.nodes}
-    ef = {n: 0 for n in G.nodes}
-    
-    for node in topo_order:
-        duration = durations.get(node, 0)
-        
-        # Default start is 0
-        node_es = 0
-        
-        # Check predecessors
-        preds = list(G.predecessors(node))
-        if preds:
-            constraints = []
-            for pred in preds:
-                edge = G[pred][node]
-                dep_type = edge.get("type", "FS")
-                lag = edge.get("lag", 0)
-                
-                pred_ef = ef[pred]
-                pred_es = es[pred]
-                pred_dur = durations.get(pred, 0)
-                
-                # Logic:
-                # FS: ES_succ >= EF_pred + lag 
-                # (Standard CPM: EF is usually finish day index. If A finishes day 5, B starts day 6?
-                #  Or if A finishes day 5 (at end of day 5), B starts day 6?
-                #  If we use 0-based index: Day 0 is first day.
-                #  Duration 1. EF = Start + Dur - 1?
-                #  Let's stick to: End = Start + Duration (Exclusive End).
-                #  So if Start=0, Dur=5, End=5.
-                #  FS: Start >= End + Lag? No, usually Start >= Finish.
-                #  If Finish is exclusive (Day 5), then Start >= 5. Correct.
-                
-                # FS: ES >= pred_EF + lag
-                if dep_type == "FS":
-                    constraints.append(pred_ef + lag)
-                # SS: ES >= pred_ES + lag
-                elif dep_type == "SS":
-                    constraints.append(pred_es + lag)
-                # FF: EF >= pred_EF + lag => ES + dur >= pred_EF + lag => ES >= pred_EF + lag - dur
-                elif dep_type == "FF":
-                    constraints.append(pred_ef + lag - duration)
-                # SF: EF >= pred_ES + lag => ES + dur >= pred_ES + lag => ES >= pred_ES + lag - dur
-                elif dep_type == "SF":
-                    constraints.append(pred_es + lag - duration)
-            
-            if constraints:
-                node_es = max(constraints)
-        
-        # Set ES and EF
-        # Ensure ES is not negative? CPM allows negative relative to start if lags force it? 
-        # Usually project starts at 0. But if a task has negative lag from Start, it might go negative.
-        # We will keep it raw.
-        es[node] = node_es
-        ef[node] = node_es + duration
-
-    # Project Duration
-    if not ef:
-        return {}
-        
-    project_finish = max(ef.values())
+    project_finish = max(ef)
     
     # --- Backward Pass ---
-    ls = {n: project_finish for n in G.nodes}
-    lf = {n: project_finish for n in G.nodes}
-    
-    for node in reversed(topo_order):
-        duration = durations.get(node, 0)
-        
-        # Default LF is project finish, unless constrained by successors
-        cols = []
-        succs = list(G.successors(node))
-        
-        if not succs:
-            node_lf = project_finish
-        else:
-            constraints = []
-            for succ in succs:
-                edge = G[node][succ]
-                dep_type = edge.get("type", "FS")
-                lag = edge.get("lag", 0)
-                
-                succ_ls = ls[succ]
-                succ_lf = lf[succ]
-                succ_dur = durations.get(succ, 0)
-                
-                # Logic (Reversed):
-                # FS: successor ES >= my EF + lag => my EF <= successor ES - lag
-                #     my LF <= succ_LS - lag
-                if dep_type == "FS":
-                    constraints.append(succ_ls - lag)
-                # SS: succ ES >= my ES + lag => my ES <= succ ES - lag
-                #     my LS <= succ_LS - lag
-                elif dep_type == "SS":
-                    constraints.append(succ_ls - lag) # Wait, this constrains my LS. LF = LS + Dur
-                    # If calculating LF explicitly:
-                    # LS <= X => LF - Dur <= X => LF <= X + Dur
-                # FF: succ EF >= my EF + lag => my EF <= succ EF - lag
-                #     my LF <= succ_LF - lag
-                elif dep_type == "FF":
-                    constraints.append(succ_lf - lag)
-                # SF: succ EF >= my ES + lag => my ES <= succ EF - lag
-                #     my LS <= succ_LF - lag
-                elif dep_type == "SF":
-                    # constrains LS
-                    # LF <= succ_LF - lag + dur
-                    pass # Handled below
-            
-            # We need to compute LF.
-            # Some constraints affect LS, some LF.
-            # Relation: LS = LF - Duration.
-            # So everything can be converted to LF constraint.
-            
-            # Re-eval loop for LF
-            lf_constraints = []
-            # Initialize with Project Finish if no successors? No, we are iterating.
-            # If we are strictly internal, we look at ALL successors.
-            # If node is sink, LF = project_finish.
-             
-            for succ in succs:
-                edge = G[node][succ]
-                dep_type = edge.get("type", "FS")
-                lag = edge.get("lag", 0)
-                
-                succ_ls = ls[succ]
-                succ_lf = lf[succ]
-                
-                if dep_type == "FS":
-                    # my LF <= succ_LS - lag
-                    lf_constraints.append(succ_ls - lag)
-                elif dep_type == "SS":
-                    # my LS <= succ_LS - lag => LF - dur <= succ_LS - lag => LF <= succ_LS - lag + dur
-                    lf_constraints.append(succ_ls - lag + duration)
-                elif dep_type == "FF":
-                    # my LF <= succ_LF - lag
-                    lf_constraints.append(succ_lf - lag)
-                elif dep_type == "SF":
-                    # my LS <= succ_LF - lag => LF <= succ_LF - lag + dur
-                    lf_constraints.append(succ_lf - lag + duration)
-            
-            if lf_constraints:
-                node_lf = min(lf_constraints)
-            else:
-                node_lf = project_finish # Should not happen if succs exist, but logic holds
-
-        lf[node] = node_lf
-        ls[node] = node_lf - duration
+    succ_graph = _pack_graph(G, topo_order, G.succ)
+    if fs_only:
+        ls, lf = _backward_pass_fs0(succ_graph[0], succ_graph[1], dur, project_finish)
+    else:
+        ls, lf = _backward_pass(*succ_graph, dur, project_finish)
 
     # --- Results ---
+    position = {n: i for i, n in enumerate(topo_order)}
     results = {}
     for node in G.nodes:
-        node_es = es[node]
-        node_ef = ef[node]
-        node_ls = ls[node]
-        node_lf = lf[node]
+        i = position[node]
+        node_es = es[i]
+        node_ef = ef[i]
+        node_ls = ls[i]
+        node_lf = lf[i]
         
         # Float
         total_float = node_ls - node_es
@@ -276,49 +300,37 @@ def convert_offsets_to_dates(cpm_results, project_start_date, durations):
     p_start = np.busday_offset(p_start, 0, roll='forward', weekmask='1111100')
     
     enriched_results = cpm_results.copy()
+    if not enriched_results:
+        return enriched_results
     
-    for act_id, data in enriched_results.items():
-        # Get offsets
-        es_off = int(data["ES"])
-        ef_off = int(data["EF"])
-        ls_off = int(data["LS"])
-        lf_off = int(data["LF"])
-        dur = durations.get(act_id, 0)
-        
-        # Calculate Dates
-        # ES Date = Start + ES offset
-        es_date_np = np.busday_offset(p_start, es_off, roll='forward', weekmask='1111100')
-        
-        # EF Date
-        # If duration > 0: Finish = Start + EF - 1 (Inclusive)
-        # If duration == 0: Finish = Start + EF (same as ES basically)
-        # Logic: EF in integer domain is usually exclusive end index.
-        # But we want Inlcusive Calendar Date.
-        # If Start=0 (Mon). Dur=1. EF=1.
-        # Finish should be Mon => Start + 0 offset.
-        # So offset is EF - 1.
-        
-        if dur > 0:
-            ef_date_np = np.busday_offset(p_start, ef_off - 1, roll='forward', weekmask='1111100')
-        else:
-            # Milestone: Finish = Start (ES)
-            # Or use EF offset which should act like ES
-            ef_date_np = np.busday_offset(p_start, ef_off, roll='forward', weekmask='1111100')
-
-        # LS Date
-        ls_date_np = np.busday_offset(p_start, ls_off, roll='forward', weekmask='1111100')
-        
-        # LF Date
-        if dur > 0:
-             lf_date_np = np.busday_offset(p_start, lf_off - 1, roll='forward', weekmask='1111100')
-        else:
-             lf_date_np = np.busday_offset(p_start, lf_off, roll='forward', weekmask='1111100')
-             
-        # Convert to strings
-        data["ES_date"] = str(es_date_np)
-        data["EF_date"] = str(ef_date_np)
-        data["LS_date"] = str(ls_date_np)
-        data["LF_date"] = str(lf_date_np)
+    # Gather offsets for all activities so each date is one array busday_offset call
+    rows = list(enriched_results.values())
+    es_off = np.array([int(data["ES"]) for data in rows], dtype=np.int64)
+    ef_off = np.array([int(data["EF"]) for data in rows], dtype=np.int64)
+    ls_off = np.array([int(data["LS"]) for data in rows], dtype=np.int64)
+    lf_off = np.array([int(data["LF"]) for data in rows], dtype=np.int64)
+    durs = [durations.get(act_id, 0) for act_id in enriched_results]
+    has_dur = np.array([dur > 0 for dur in durs], dtype=bool)
+    
+    # ES / LS Date = Start + offset
+    es_dates = np.busday_offset(p_start, es_off, roll='forward', weekmask='1111100')
+    ls_dates = np.busday_offset(p_start, ls_off, roll='forward', weekmask='1111100')
+    
+    # EF / LF in integer domain are exclusive end indices, but we want the inclusive calendar date.
+    # If Start=0 (Mon), Dur=1, EF=1 -> Finish should be Mon, so offset is EF - 1.
+    # Milestones (duration 0) finish on their start offset.
+    ef_dates = np.busday_offset(p_start, np.where(has_dur, ef_off - 1, ef_off), roll='forward', weekmask='1111100')
+    lf_dates = np.busday_offset(p_start, np.where(has_dur, lf_off - 1, lf_off), roll='forward', weekmask='1111100')
+    
+    # Convert to strings
+    for data, dur, es_d, ef_d, ls_d, lf_d in zip(
+        rows, durs, es_dates.astype(str).tolist(), ef_dates.astype(str).tolist(),
+        ls_dates.astype(str).tolist(), lf_dates.astype(str).tolist()
+    ):
+        data["ES_date"] = es_d
+        data["EF_date"] = ef_d
+        data["LS_date"] = ls_d
+        data["LF_date"] = lf_d
         
         # Also return planned_duration (calculated)
         data["planned_duration"] = dur
@@ -1,6 +1,7 @@
 import re
 import networkx as nx
 import pandas as pd
+import utils
 
 # Regex for parsing: <ID><TYPE><OPTIONAL LAG>
 # Group 1: ID (digits)
@@ -47,6 +48,16 @@ def parse_dependency_string(dep_str):
         })
     return deps
 
+def topological_order(G):
+    """
+    Returns G's nodes in topological order, or None if G has a cycle.
+    One sort answers both questions, instead of a DAG check followed by a sort.
+    """
+    try:
+        return list(nx.topological_sort(G))
+    except nx.NetworkXUnfeasible:
+        return None
+
 def build_dag_and_validate(df):
     """
     Builds a NetworkX DiGraph from the dataframe.
@@ -66,66 +77,83 @@ def build_dag_and_validate(df):
     # 1. Add all nodes first to ensure we know what exists
     # Activity IDs can be int or string in CSV, force int for consistency if numeric
     # The requirement said activity_id are 1, 2, etc. so assume int.
+    # The graph itself is the id -> exists map (node lookup is a dict lookup).
     
-    # helper map: id -> exists
-    valid_ids = set()
+    # Columns are looked up by position
+    cols = {c: i for i, c in enumerate(df.columns)}
+    id_pos = cols["activity_id"]
+    name_pos = cols.get("activity_name")
+    pred_pos = cols.get("predecessor_id")
     
     # First pass: Add nodes
-    for _, row in df.iterrows():
-        try:
-            act_id = int(row["activity_id"])
-            valid_ids.add(act_id)
-            G.add_node(act_id, label=row.get("activity_name", str(act_id)))
-        except (ValueError, TypeError):
-             # If ID is invalid, we can't really do much with it in the graph
-             continue
+    # If ID is invalid (None), we can't really do much with it in the graph
+    row_ids = utils.parse_activity_ids(df.iloc[:, id_pos])
+    names = df.iloc[:, name_pos].tolist() if name_pos is not None else [None] * len(df)
+    G.add_nodes_from(
+        (act_id, {"label": name if name_pos is not None else str(act_id)})
+        for act_id, name in zip(row_ids, names) if act_id is not None
+    )
 
     # Second pass: Add edges and validate
-    for _, row in df.iterrows():
-        try:
-            act_id = int(row["activity_id"])
-        except ValueError:
+    # All dependency strings are split and parsed at once; each part keeps its
+    # row position as index, and parts stay in their original order.
+    preds = pd.Series(df.iloc[:, pred_pos].to_numpy() if pred_pos is not None else None, index=range(len(df)), dtype=object)
+    row_acts = pd.Series(row_ids, dtype=object)
+    # Handling NaN/None
+    has_deps = preds.notna() & (preds.astype(str).str.strip() != "") & row_acts.notna()
+    parts = preds[has_deps].astype(str).str.split(";").explode().str.strip()
+    parts = parts[parts.notna() & (parts != "")]
+    parsed = parts.str.extract(DEPENDENCY_REGEX)
+    
+    # Check 0: Syntax. A malformed part rejects the whole row (first one is reported)
+    row_status = {}
+    malformed = parsed["id"].isna()
+    for pos, part in parts[malformed].groupby(level=0).first().items():
+        row_status[pos] = f"ERROR: Malformed dependency: '{part}'"
+    parsed = parsed[~parsed.index.isin(row_status.keys())]
+    
+    pred_ids = parsed["id"].astype("int64")
+    act_ids = row_acts[parsed.index].astype("int64")
+    # Lag: "+2d" -> 2
+    lags = pd.to_numeric(parsed["lag"].str[:-1]).fillna(0).astype("int64")
+    
+    # Check 1: Self-dependency / Check 2: Missing reference
+    # A row stops at its first bad part; the parts before it still become edges.
+    self_dep = (pred_ids == act_ids).to_numpy()
+    missing = (~pred_ids.isin(G)).to_numpy()
+    bad = pd.Series(self_dep | missing, index=parsed.index)
+    bad_count = bad.groupby(level=0).cumsum()
+    first_bad = (bad & (bad_count == 1)).to_numpy()
+    for pos, pred_id, is_self in zip(parsed.index[first_bad], pred_ids[first_bad], self_dep[first_bad]):
+        if is_self:
+            row_status[pos] = f"ERROR: Self-dependency on {pred_id}"
+        else:
+            row_status[pos] = f"ERROR: Missing predecessor ID {pred_id}"
+    keep = (bad_count == 0).to_numpy()
+    
+    # Add edges
+    G.add_edges_from(
+        (p, a, {"type": t, "lag": l})
+        for p, a, t, l in zip(pred_ids[keep].tolist(), act_ids[keep].tolist(), parsed["type"][keep].tolist(), lags[keep].tolist())
+    )
+    
+    for pos, act_id in enumerate(row_ids):
+        if act_id is None:
             validation_results["UNKNOWN"] = "ERROR: Invalid Activity ID"
             continue
-            
-        status = "OK"
-        preds_str = row.get("predecessor_id")
-        
-        # Handling NaN/None
-        if pd.isna(preds_str) or str(preds_str).strip() == "":
-            validation_results[act_id] = "OK"
-            continue
-            
-        try:
-            parsed_deps = parse_dependency_string(str(preds_str))
-            
-            for dep in parsed_deps:
-                pred_id = dep["predecessor_id"]
-                
-                # Check 1: Self-dependency
-                if pred_id == act_id:
-                    status = f"ERROR: Self-dependency on {pred_id}"
-                    break
-                
-                # Check 2: Missing reference
-                if pred_id not in valid_ids:
-                    status = f"ERROR: Missing predecessor ID {pred_id}"
-                    break
-                
-                # Add edge
-                G.add_edge(pred_id, act_id, type=dep["type"], lag=dep["lag"])
-                
-        except ValueError as e:
-            status = f"ERROR: {str(e)}"
-        
-        validation_results[act_id] = status
+        validation_results[act_id] = row_status.get(pos, "OK")
 
     # Check 3: Cycles
-    # NetworkX simple_cycles is computationally expensive for large graphs, 
-    # but efficient enough for typical project schedules (< 10k nodes).
-    # However, valid DAGs have no cycles. finding_cycle raises error if found.
+    # NetworkX simple_cycles is computationally expensive for large graphs
+    # (it enumerates every circuit). A linear-time DAG check settles the
+    # common case; only when a cycle exists do we enumerate, and then only
+    # inside the strongly connected components that can hold one.
     try:
-        cycles = list(nx.simple_cycles(G))
+        cycles = []
+        if topological_order(G) is None:
+            for comp in nx.strongly_connected_components(G):
+                if len(comp) > 1:
+                    cycles.extend(nx.simple_cycles(G.subgraph(comp)))
         if cycles:
             # Mark nodes involved in cycles
             for cycle in cycles:
@@ -48,16 +48,17 @@ results = forecasting_engine.calculate_forecasts(df, dag_graph)
 
 # Check Results for In-Progress Successors
 print("\n--- Detailed Results ---")
+# Id sets built once (instead of scanning df per node)
+in_prog_ids = set(in_progress["activity_id"])
+started_ids = set(df.loc[df["actual_start"].notna(), "activity_id"])
+unfinished_ids = set(df.loc[df["actual_finish"].isna(), "activity_id"])
 for node, res in results.items():
     # Only show if interesting (delay carried in > 0 OR is in progress)
-    is_interesting = (res["delay_carried_in"] > 0) or (res["percent_complete"] > 0 and res["percent_complete"] < 100) or (df.loc[df["activity_id"]==node, "actual_start"].notna().any() and df.loc[df["activity_id"]==node, "actual_finish"].isna().any())
+    is_interesting = (res["delay_carried_in"] > 0) or (res["percent_complete"] > 0 and res["percent_complete"] < 100) or (node in started_ids and node in unfinished_ids)
     
     # Check if ANY predecessor was in progress
     preds = list(dag_graph.predecessors(node))
-    pred_in_progress = False
-    for p in preds:
-        if p in in_progress["activity_id"].values:
-            pred_in_progress = True
+    pred_in_progress = any(p in in_prog_ids for p in preds)
             
     if is_interesting or pred_in_progress:
         print(f"Node {node}:")
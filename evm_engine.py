@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import forecasting_engine
 
 def calculate_evm_metrics(df_schedule, status_date=None, eac_method_index=0):
     """
@@ -42,81 +41,65 @@ def calculate_evm_metrics(df_schedule, status_date=None, eac_method_index=0):
         return metrics
         
     # Helpers
-    def get_val(row, col):
-        return row.get(col, 0) if pd.notna(row.get(col)) else 0
+    def num_col(col):
+        if col not in df_schedule.columns:
+            return np.zeros(len(df_schedule))
+        return df_schedule[col].fillna(0).to_numpy(dtype=float)
+
+    def date_col(col):
+        if col not in df_schedule.columns:
+            return np.full(len(df_schedule), np.datetime64("NaT"), dtype="datetime64[D]")
+        raw = df_schedule[col]
+        dates = pd.to_datetime(raw, errors="coerce", format="ISO8601")
+        retry = dates.isna() & raw.notna()
+        if retry.any():
+            dates[retry] = pd.to_datetime(raw[retry], errors="coerce", format="mixed")
+        return dates.to_numpy().astype("datetime64[D]")
 
     # 1. Aggregate Basic Metrics (BAC, AC, EV, Remaining Cost for Bottom-Up)
-    total_bac = 0.0
-    total_ac = 0.0
-    total_ev = 0.0
-    total_pv = 0.0
-    total_remaining_cost = 0.0 # For Bottom-Up
+    planned = num_col("planned_cost")
+    actual = num_col("actual_cost")
+    remaining = num_col("remaining_cost") # Computed in MVP 5
+    pct = num_col("percent_complete") / 100.0
     
-    for _, row in df_schedule.iterrows():
-        planned_cost = get_val(row, "planned_cost")
-        actual_cost = get_val(row, "actual_cost")
-        remaining_cost = get_val(row, "remaining_cost") # Computed in MVP 5
-        
-        pct_comp = get_val(row, "percent_complete") / 100.0
-        
-        # BAC
-        total_bac += planned_cost
-        
-        # AC
-        total_ac += actual_cost
-        
-        # EV = BAC * % Complete
-        total_ev += (planned_cost * pct_comp)
-        
-        # Remaining (Bottom-Up ETC input)
-        total_remaining_cost += remaining_cost
-
-        # PV Calculation
-        # Linear burn based on Status Date
-        # If today < Start, PV=0. If today > Finish, PV=BAC.
-        # Else fraction.
-        
-        p_start = row.get("planned_start")
-        p_finish = row.get("planned_finish")
-        
-        if pd.notna(p_start) and pd.notna(p_finish):
-            # Using working days for valid fraction
-            # PV = BAC * (WorkingDays(Start, Status) / WorkingDays(Start, Finish))
-            
-            # Convert to ISO strings for existing utils
-            try:
-                # Total Duration of task
-                total_dur = forecasting_engine.count_working_days(p_start, p_finish, inclusive=True)
-                
-                # Elapsed Duration
-                # If status < start -> 0
-                # If status > finish -> total_dur
-                
-                # Check bounds
-                # We need simple comparison. String comparison works for ISO YYYY-MM-DD
-                s_date_str = status_date.isoformat()
-                
-                if s_date_str >= str(p_finish):
-                    elapsed = total_dur
-                elif s_date_str < str(p_start):
-                    elapsed = 0
-                else:
-                    elapsed = forecasting_engine.count_working_days(p_start, s_date_str, inclusive=True)
-                
-                fraction = 0
-                if total_dur > 0:
-                    fraction = elapsed / total_dur
-                elif total_dur == 0:
-                    # milestone. If passed, 1.0. 
-                    fraction = 1.0 if elapsed > 0 else 0.0
-                    
-                total_pv += (planned_cost * fraction)
-                
-            except:
-                pass
+    total_bac = float(planned.sum())
+    total_ac = float(actual.sum())
+    # EV = BAC * % Complete
+    total_ev = float((planned * pct).sum())
+    # Remaining (Bottom-Up ETC input)
+    total_remaining_cost = float(remaining.sum())
+    
+    # PV Calculation
+    # Linear burn based on Status Date, all tasks at once
+    # If today < Start, PV=0. If today > Finish, PV=BAC.
+    # Else fraction.
+    # PV = BAC * (WorkingDays(Start, Status) / WorkingDays(Start, Finish))
+    # Tasks without readable planned dates carry no PV.
+    p_start = date_col("planned_start")
+    p_finish = date_col("planned_finish")
+    status = np.datetime64(status_date, "D")
+    dated = ~(np.isnat(p_start) | np.isnat(p_finish))
+    p_start, p_finish, planned_dated = p_start[dated], p_finish[dated], planned[dated]
+    
+    if len(p_start) == 0 or (status < p_start.min() and status < p_finish.min()):
+        # Status date before every task's dates: nothing planned yet
+        total_pv = 0.0
+    else:
+        # Working days, inclusive of the end date when it is a working day
+        total_dur = np.busday_count(p_start, p_finish, weekmask="1111100") + np.is_busday(p_finish, weekmask="1111100")
+        if status >= p_finish.max():
+            # Past every finish: elapsed == total for each task, so tasks with
+            # working days count in full (0-day milestones have elapsed 0)
+            fraction = (total_dur > 0).astype(float)
         else:
-            # If no dates, assume no PV unless complete?
-            pass
+            elapsed = np.busday_count(p_start, status, weekmask="1111100") + np.is_busday(status, weekmask="1111100")
+            elapsed = np.select([status >= p_finish, status < p_start], [total_dur, 0], elapsed)
+            
+            # Milestones (0 working days) count in full once passed
+            fraction = np.zeros(len(total_dur))
+            np.divide(elapsed, total_dur, out=fraction, where=total_dur > 0)
+            fraction[(total_dur == 0) & (elapsed > 0)] = 1.0
+        total_pv = float((planned_dated * fraction).sum())
 
     metrics["BAC"] = total_bac
     metrics["AC"] = total_ac
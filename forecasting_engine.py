@@ -1,240 +1,271 @@
+import functools
 import pandas as pd
 import numpy as np
-import networkx as nx
+import utils
+import dag_engine
+
+def _to_day(value):
+    """
+    Parses one date (ISO string or datetime) to datetime64[D].
+    Blank or unreadable values give NaT; this is the only place that can fail.
+    """
+    try:
+        return np.datetime64(pd.to_datetime(value), 'D')
+    except (ValueError, TypeError, OverflowError):
+        return np.datetime64("NaT")
+
+def _working_days(s, e, inclusive):
+    """
+    Working days between two datetime64[D] days (NaT -> 0).
+    """
+    if np.isnat(s) or np.isnat(e):
+        return 0
+    # Day ordinals as the cache key: schedules reuse the same date pairs a lot
+    return _working_days_cached(int(s.astype(np.int64)), int(e.astype(np.int64)), bool(inclusive))
+
+@functools.lru_cache(maxsize=4096)
+def _working_days_cached(s_ord, e_ord, inclusive):
+    s = np.datetime64(s_ord, 'D')
+    e = np.datetime64(e_ord, 'D')
+    
+    # busday_count is exclusive of end.
+    count = np.busday_count(s, e, weekmask='1111100')
+    
+    if inclusive:
+        # Standard Duration = busday_count(start, end) + 1 (if end is working)
+        # If Mon-Mon (Same day). Excl=0. Incl=1.
+        # If Mon-Sun. Excl=5. Incl=5 (Sat/Sun ignore).
+        if np.is_busday(e, weekmask='1111100'):
+            count += 1
+    
+    return int(count)
+
+def _delay_days(t, b):
+    """
+    Working-day difference t - b between two datetime64[D] days (NaT -> 0).
+    """
+    if np.isnat(t) or np.isnat(b):
+        return 0 # Or None? 0 implies no delay.
+    # Day ordinals as the cache key (many tasks share the same finish/baseline pair)
+    return _delay_days_cached(int(t.astype(np.int64)), int(b.astype(np.int64)))
+
+@functools.lru_cache(maxsize=4096)
+def _delay_days_cached(t_ord, b_ord):
+    t = np.datetime64(t_ord, 'D')
+    b = np.datetime64(b_ord, 'D')
+        
+    # We need difference in working days.
+    # If t > b: positive (busday_count(b, t))
+    # If t < b: negative (-busday_count(t, b))
+    if t >= b:
+         return int(np.busday_count(b, t, weekmask='1111100'))
+    return -int(np.busday_count(t, b, weekmask='1111100'))
 
 def count_working_days(start, end, inclusive=False):
     """
     Counts working days between start and end (ISO strings or datetimes).
     Mon-Fri working.
     """
-    try:
-        s = np.datetime64(pd.to_datetime(start), 'D')
-        e = np.datetime64(pd.to_datetime(end), 'D')
-        
-        if np.isnat(s) or np.isnat(e):
-            return 0
-        
-        # busday_count is exclusive of end.
-        count = np.busday_count(s, e, weekmask='1111100')
-        
-        if inclusive:
-            # Check if end date itself is a working day?
-            # Or just add 1? 
-            # If Mon-Mon (Same day). Excl=0. Incl=1.
-            # If Mon-Sun. Excl=5. Incl=5 (Sat/Sun ignore).
-            # Logic: If inclusive, we treat 'end' as part of the range.
-            # busday_count(s, e+1) effectively.
-            # But e+1 validity matters.
-            # Only add 1 if 'end' is a working day?
-            # Standard Duration = busday_count(start, end) + 1 (if end is working)
-            # Simplification: busday_count(s, e + 1 day)
-            
-            e_plus_1 = np.busday_offset(e, 1, roll='forward', weekmask='1111100')
-            # Wait, if e is Friday. e+1 is Monday? 
-            # busday_count(Fri, Mon) = 1.
-            # Correct.
-            # But simpler: count = busday_count(s, e). If e is working, +1?
-            is_working = np.is_busday(e, weekmask='1111100')
-            if is_working:
-                count += 1
-        
-        return int(count)
-    except Exception:
-        return 0
+    return _working_days(_to_day(start), _to_day(end), inclusive)
 
 def calculate_delay_metric_days(target_date, baseline_date):
     """
     Calculates delay in working days: target - baseline.
     Positive = Late. Negative = Early.
     """
-    try:
-        t = np.datetime64(pd.to_datetime(target_date), 'D')
-        b = np.datetime64(pd.to_datetime(baseline_date), 'D')
-        
-        if np.isnat(t) or np.isnat(b):
-            return 0 # Or None? 0 implies no delay.
-            
-        # We need difference in working days.
-        # If t > b: positive (busday_count(b, t))
-        # If t < b: negative (-busday_count(t, b))
-        
-        if t >= b:
-             return int(np.busday_count(b, t, weekmask='1111100'))
-        else:
-             return -int(np.busday_count(t, b, weekmask='1111100'))
-             
-    except:
-        return 0
+    return _delay_days(_to_day(target_date), _to_day(baseline_date))
+
+def _parse_days(col):
+    """
+    Parses a date column once to datetime64[D]. Blank or unreadable values
+    become NaT (count_working_days / calculate_delay_metric_days treat those as 0).
+    """
+    days = pd.to_datetime(col, errors="coerce", format="ISO8601")
+    retry = days.isna() & col.notna()
+    if retry.any():
+        days[retry] = pd.to_datetime(col[retry], errors="coerce", format="mixed")
+    return days.to_numpy().astype("datetime64[D]")
 
-def calculate_forecasts(df, G):
+def _working_days_array(start, end):
     """
-    Calculates forecasting metrics and returns a DataFrame (or dict) to merge.
+    Array form of count_working_days(start, end, inclusive=True).
+    """
+    counts = np.zeros(len(start), dtype=int)
+    valid = ~(np.isnat(start) | np.isnat(end))
+    counts[valid] = (np.busday_count(start[valid], end[valid], weekmask='1111100')
+                     + np.is_busday(end[valid], weekmask='1111100'))
+    return counts
+
+def _delay_days_array(target, baseline):
+    """
+    Array form of calculate_delay_metric_days(target, baseline).
+    """
+    delays = np.zeros(len(target), dtype=int)
+    valid = ~(np.isnat(target) | np.isnat(baseline))
+    t, b = target[valid], baseline[valid]
+    # Count from the earlier day to the later one and sign it (busday_count is
+    # not antisymmetric when either end falls on a weekend)
+    delays[valid] = np.where(t >= b, 1, -1) * np.busday_count(np.minimum(t, b), np.maximum(t, b), weekmask='1111100')
+    return delays
+
+# One typed record per graph node. Day counts are int32; the remaining duration
+# and forecast dates are passed through from the schedule as-is (object).
+FORECAST_DTYPE = np.dtype([("percent_complete", np.int8),
+                           ("actual_duration", np.int32),
+                           ("baseline_1_duration", np.int32),
+                           ("remaining_duration_days", object),
+                           ("forecast_start_date", object),
+                           ("forecast_finish_date", object),
+                           ("delay_carried_in", np.int32),
+                           ("total_schedule_delay", np.int32),
+                           ("task_created_delay", np.int32),
+                           ("delay_absorbed", np.int32)])
+FORECAST_COLUMNS = list(FORECAST_DTYPE.names)
+
+def _raw_values(df, col):
+    """
+    Column values as an object array with None for NaN/missing (the raw dates are
+    passed through to the forecast output unchanged).
+    """
+    if col not in df.columns:
+        return np.full(len(df), None, dtype=object)
+    return df[col].astype(object).where(df[col].notna(), None).to_numpy()
+
+def _is_set(values):
+    """
+    Truthiness per value (None, "" and 0 count as not set).
+    """
+    return np.array([bool(v) for v in values], dtype=bool)
+
+def calculate_forecasts(df, G, as_frame=False):
+    """
+    Calculates forecasting metrics per graph node.
     Assumes df has 'ES_date', 'EF_date' (CPM results) and 'baseline_1_start/finish'.
-    Uses Topological Sort to propagate Delay Carried In correctly.
-    """
-    results = {}
-    
-    # Pre-process dataframe to dict for speed
-    cols = ["activity_id", "actual_start", "actual_finish", "baseline_1_start", "baseline_1_finish", 
-            "ES_date", "EF_date", "planned_duration"]
-            
-    # Lookup map: activity_id -> row
-    df_lookup = {}
-    for idx, row in df.iterrows():
-        try:
-            aid = int(row["activity_id"])
-            df_lookup[aid] = row
-        except:
-            pass
-
-    # Ensure Topological Order for propagation
-    if nx.is_directed_acyclic_graph(G):
-        ordered_nodes = list(nx.topological_sort(G))
-    else:
+    Delay Carried In is the largest finish variance among a task's predecessors.
+    
+    Returns a dict of activity_id -> metrics dict, or with as_frame=True a DataFrame
+    of FORECAST_COLUMNS indexed by activity_id (built straight from the columns).
+    """
+    # Row position per activity_id (last row wins for duplicate ids)
+    row_pos = {}
+    row_ids = utils.parse_activity_ids(df["activity_id"]) if "activity_id" in df.columns else [None] * len(df)
+    for pos, aid in enumerate(row_ids):
+        if aid is not None:
+            row_pos[aid] = pos
+
+    # Parse every date column once; all per-task metrics are computed for every
+    # row at once and then gathered per graph node.
+    days = {}
+    for c in ["actual_start", "actual_finish", "baseline_1_start", "baseline_1_finish", "ES_date", "EF_date"]:
+        days[c] = _parse_days(df[c]) if c in df.columns else np.full(len(df), np.datetime64("NaT"), dtype="datetime64[D]")
+    
+    act_start = _raw_values(df, "actual_start")
+    act_fin = _raw_values(df, "actual_finish")
+    cpm_es = _raw_values(df, "ES_date")
+    cpm_ef = _raw_values(df, "EF_date")
+    plan_dur = _raw_values(df, "planned_duration")
+    plan_dur[pd.isna(plan_dur)] = 0
+    
+    # 1. Percent Complete & Actual/Remaining Duration
+    finished = _is_set(act_fin)
+    in_progress = ~finished & _is_set(act_start)
+    not_started = ~finished & ~in_progress
+    
+    row_percent = np.where(finished, 100, 0) # 0% or In Progress -> 0 (MVP Requirement)
+    row_actual = np.where(finished, _working_days_array(days["actual_start"], days["actual_finish"]), 0)
+    row_remaining = np.where(finished, 0, plan_dur)
+    
+    # Calculate Baseline Duration (Requested feature)
+    has_baseline = _is_set(_raw_values(df, "baseline_1_start")) & _is_set(_raw_values(df, "baseline_1_finish"))
+    row_baseline = np.where(has_baseline, _working_days_array(days["baseline_1_start"], days["baseline_1_finish"]), 0)
+    
+    # Forecast = Actual (finished), Actual Start (in progress) or CPM ES/EF (not started)
+    row_start = np.where(not_started, cpm_es, act_start)
+    row_start_days = np.where(not_started, days["ES_date"], days["actual_start"])
+    row_fin = np.where(finished, act_fin, cpm_ef)
+    row_fin_days = np.where(finished, days["actual_finish"], days["EF_date"])
+    
+    # In Progress: Forecast Finish = Actual Start + Planned Duration (Business Days)
+    # (Simplification: assuming original duration holds if not updated)
+    # finish = start + duration - 1 (inclusive); no duration -> finish on the start date.
+    # Unreadable start or duration falls back to the CPM EF set above.
+    # (durations follow the same int() rules as activity ids; blank -> 0)
+    dur_days = utils.parse_activity_ids(pd.Series(plan_dur, dtype=object).infer_objects())
+    dur_ok = np.array([d is not None for d in dur_days], dtype=bool)
+    dur_days = np.array([d if d is not None else 0 for d in dur_days], dtype="int64")
+    progress_ok = in_progress & dur_ok & ~np.isnat(days["actual_start"])
+    
+    same_day = progress_ok & (dur_days <= 0)
+    row_fin[same_day] = act_start[same_day]
+    row_fin_days[same_day] = days["actual_start"][same_day]
+    
+    offset_rows = progress_ok & (dur_days > 0)
+    offset_days = np.busday_offset(days["actual_start"][offset_rows], dur_days[offset_rows] - 1, roll='forward', weekmask='1111100')
+    row_fin[offset_rows] = offset_days.astype(str).tolist()
+    row_fin_days[offset_rows] = offset_days
+
+    # Topological Order (keeps results ordered predecessors-first)
+    ordered_nodes = dag_engine.topological_order(G)
+    if ordered_nodes is None:
         # Fallback if cycles exist (should be handled by app.py validation, but safety check)
         ordered_nodes = list(G.nodes)
-            
-    for node in ordered_nodes:
-        # Defaults
-        res = {
-            "percent_complete": 0,
-            "actual_duration": 0,
-            "baseline_1_duration": 0,
-            "remaining_duration_days": 0,
-            "forecast_start_date": None,
-            "forecast_finish_date": None,
-            "delay_carried_in": 0,
-            "total_schedule_delay": 0,
-            "task_created_delay": 0,
-            "delay_absorbed": 0
-        }
-        
-        row = df_lookup.get(node)
-        if row is None:
-            results[node] = res
-            continue
-            
-        # Helper
-        def get_val(r, c): return r[c] if c in r and not pd.isna(r[c]) else None
-            
-        # 1. Percent Complete & Actual/Remaining Duration
-        act_start = get_val(row, "actual_start")
-        act_fin = get_val(row, "actual_finish")
-        plan_dur = get_val(row, "planned_duration") 
-        if plan_dur is None: plan_dur = 0
-        
-        # CPM Forecast Dates (ES/EF)
-        cpm_es = get_val(row, "ES_date")
-        cpm_ef = get_val(row, "EF_date")
-        
-        # Baselines
-        bl_start = get_val(row, "baseline_1_start")
-        bl_fin = get_val(row, "baseline_1_finish")
-        
-        # Calculate Baseline Duration (Requested feature)
-        if bl_start and bl_fin:
-            res["baseline_1_duration"] = count_working_days(bl_start, bl_fin, inclusive=True)
-        else:
-            res["baseline_1_duration"] = 0
-
-        # Logic
-        forecast_start_for_delay = None
-        forecast_fin_for_delay = None
-
-        if act_fin:
-            res["percent_complete"] = 100
-            res["actual_duration"] = count_working_days(act_start, act_fin, inclusive=True)
-            res["remaining_duration_days"] = 0
-            
-            # Forecast = Actual
-            res["forecast_start_date"] = act_start
-            res["forecast_finish_date"] = act_fin
-            
-            forecast_start_for_delay = act_start
-            forecast_fin_for_delay = act_fin
-            
-        else:
-            # 0% or In Progress
-            res["percent_complete"] = 0 # MVP Requirement
-            res["actual_duration"] = 0
-            
-            if act_start:
-                 # In Progress
-                 # Calculate Forecast Finish based on Actual Start + Planned Duration
-                 # (Simplification: assuming original duration holds if not updated)
-                 res["remaining_duration_days"] = plan_dur
-                 res["forecast_start_date"] = act_start
-                 
-                 # Calc finish date: Start + Duration (Business Days)
-                 # We need date math here. 
-                 # However, we don't have the heavy numpy date logic imported easily as helper here 
-                 # without duplicating cpm_engine logic or importing it.
-                 # BUT, we can use calculate_delay_metric_days kind of logic or simple approximation?
-                 # Better: Use numpy busday_offset since we imported numpy.
-                 
-                 try:
-                     s = np.datetime64(pd.to_datetime(act_start), 'D')
-                     # finish = start + duration - 1 (inclusive)
-                     dur_days = int(plan_dur)
-                     if dur_days > 0:
-                        offset = dur_days - 1
-                        f_np = np.busday_offset(s, offset, roll='forward', weekmask='1111100')
-                        res["forecast_finish_date"] = str(f_np)
-                     else:
-                        res["forecast_finish_date"] = act_start
-                 except:
-                     # Fallback
-                     res["forecast_finish_date"] = cpm_ef
-                 
-                 forecast_start_for_delay = act_start
-                 forecast_fin_for_delay = res["forecast_finish_date"]
-            else:
-                 # Not Started
-                 res["remaining_duration_days"] = plan_dur
-                 res["forecast_start_date"] = cpm_es
-                 res["forecast_finish_date"] = cpm_ef
-                 
-                 forecast_start_for_delay = cpm_es
-                 forecast_fin_for_delay = cpm_ef
-
-        # 2. Delay Carried In (CRITICAL FIX: Use Predecessor Forecasts, not just Actuals)
-        # We propagate max delay from predecessors
-        # Delay = Pred Forecast Finish - Pred Baseline Finish
-        
-        preds = list(G.predecessors(node))
-        carried_delays = [0]
-        
-        for pred in preds:
-            # Look up predecessor's result we just calculated (since topo sorted)
-            pred_res = results.get(pred) 
-            p_row = df_lookup.get(pred)
-            
-            if pred_res and p_row is not None:
-                # Use Calculated Forecast Finish from predecessor logic
-                p_forecast_fin = pred_res.get("forecast_finish_date")
-                p_base_fin = get_val(p_row, "baseline_1_finish")
-                
-                if p_forecast_fin and p_base_fin:
-                    d = calculate_delay_metric_days(p_forecast_fin, p_base_fin)
-                    carried_delays.append(d)
-        
-        res["delay_carried_in"] = max(0, max(carried_delays))
-        
-        # 3. Total Schedule Delay
-        start_var = 0
-        fin_var = 0
-        if bl_start and forecast_start_for_delay:
-             start_var = calculate_delay_metric_days(forecast_start_for_delay, bl_start)
-        if bl_fin and forecast_fin_for_delay:
-             fin_var = calculate_delay_metric_days(forecast_fin_for_delay, bl_fin)  
-        res["total_schedule_delay"] = max(start_var, fin_var)
-        
-        # 4. Task-Created Delay
-        res["task_created_delay"] = max(0, res["total_schedule_delay"] - res["delay_carried_in"])
-        
-        # 5. Delay Absorbed
-        res["delay_absorbed"] = res["delay_carried_in"] - res["task_created_delay"]
-        
-        results[node] = res
-        
-    return results
+    n = len(ordered_nodes)
+    
+    # Gather per node (nodes without a schedule row keep the defaults)
+    node_pos = np.array([row_pos.get(node, -1) for node in ordered_nodes], dtype=int)
+    scheduled = node_pos >= 0
+    rows = node_pos[scheduled]
+    
+    def gather(row_values, default, dtype):
+        out = np.full(n, default, dtype=dtype)
+        out[scheduled] = row_values[rows]
+        return out
+    
+    results = np.zeros(n, dtype=FORECAST_DTYPE)
+    results["forecast_start_date"] = None
+    results["forecast_finish_date"] = None
+    for col, row_values in [("percent_complete", row_percent), ("actual_duration", row_actual),
+                            ("baseline_1_duration", row_baseline), ("remaining_duration_days", row_remaining),
+                            ("forecast_start_date", row_start), ("forecast_finish_date", row_fin)]:
+        results[col][scheduled] = row_values[rows]
+    f_start = gather(row_start_days, np.datetime64("NaT"), "datetime64[D]")
+    f_fin = gather(row_fin_days, np.datetime64("NaT"), "datetime64[D]")
+    bl_start_days = gather(days["baseline_1_start"], np.datetime64("NaT"), "datetime64[D]")
+    bl_fin_days = gather(days["baseline_1_finish"], np.datetime64("NaT"), "datetime64[D]")
+
+    # Delays, for all nodes at once
+    # (blank or unreadable dates give 0 variance; unscheduled nodes have NaT forecasts)
+    start_var = _delay_days_array(f_start, bl_start_days)
+    fin_var = _delay_days_array(f_fin, bl_fin_days)
+    
+    # 2. Delay Carried In (CRITICAL FIX: Use Predecessor Forecasts, not just Actuals)
+    # We propagate max delay from predecessors
+    # Delay = Pred Forecast Finish - Pred Baseline Finish, i.e. the predecessor's own fin_var.
+    # One scatter-max over the edges into scheduled nodes.
+    delay_carried_in = np.zeros(n, dtype=int)
+    # Predecessors are read straight from the graph's adjacency dict
+    node_idx = {node: i for i, node in enumerate(ordered_nodes)}
+    pred_adj = G.pred
+    edges = [(node_idx[u], i) for i, v in enumerate(ordered_nodes) if scheduled[i] for u in pred_adj[v]]
+    if edges:
+        src, dst = np.array(edges).T
+        np.maximum.at(delay_carried_in, dst, fin_var[src])
+    
+    # 3. Total Schedule Delay
+    total_schedule_delay = np.maximum(start_var, fin_var)
+    
+    # 4. Task-Created Delay
+    task_created_delay = np.maximum(0, total_schedule_delay - delay_carried_in)
+    
+    # 5. Delay Absorbed
+    delay_absorbed = delay_carried_in - task_created_delay
+    
+    results["delay_carried_in"] = delay_carried_in
+    results["total_schedule_delay"] = total_schedule_delay
+    results["task_created_delay"] = task_created_delay
+    results["delay_absorbed"] = delay_absorbed
+    
+    values = [results[col].tolist() for col in FORECAST_COLUMNS]
+    if as_frame:
+        return pd.DataFrame(dict(zip(FORECAST_COLUMNS, values)), index=ordered_nodes)
+    return {node: dict(zip(FORECAST_COLUMNS, node_values)) for node, node_values in zip(ordered_nodes, zip(*values))}
@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+import functools
+import os
+import re
 import uuid
 
 # Action Types
@@ -10,15 +13,127 @@ ACTION_FAST_TRACK = "Fast-Tracking"
 ACTION_DEFERRAL = "Scope Deferral"
 ACTION_CRASHING = "Task Crashing (Overload)"
 
-def init_recovery_workspace(df_schedule):
+# Fields of an action (narrative / project_name / resource_name only on some types)
+ACTION_COLUMNS = ["id", "type", "activity_id", "description", "narrative", "parameters",
+                  "project_name", "resource_name"]
+
+# Columns apply_action edits cell by cell; init_recovery_workspace gives these their own copy
+_WORKSPACE_EDITED_COLUMNS = ["last_change_type", "last_change_id", "is_deferred", "resource_id",
+                             "fte_allocation", "remaining_duration_days", "planned_duration",
+                             "remaining_cost", "eac_cost", "predecessor_id", "predecessors"]
+
+# Small-range numeric inputs init_recovery_workspace(downcast=True) stores as float32
+_WORKSPACE_FLOAT32_COLUMNS = ["fte_allocation", "remaining_duration_days", "planned_duration",
+                              "total_float_days", "delay_carried_in"]
+
+# Activity ids inside a predecessor string ("2FS, 3SS+2d" -> "2", "3")
+_PRED_ID_RE = re.compile(r"(\d+)")
+
+def _dag_node_id(act_id):
+    """
+    Returns the activity id in the form used for DAG nodes.
+    dag_engine stores nodes as int, so numeric ids are coerced; anything else is kept as-is.
+    """
+    try:
+        return int(act_id)
+    except (ValueError, TypeError):
+        return act_id
+
+def _parse_skills(value):
+    """
+    Parses a resource_skills cell ("a; b" or "a, b") into a set of skill names.
+    """
+    skills_str = str(value)
+    if not skills_str or skills_str.lower() == "nan":
+        return set()
+    sep = ";" if ";" in skills_str else ","
+    return set([s.strip() for s in skills_str.split(sep) if s.strip()])
+
+def _action_ids():
+    """
+    Yields new action ids (random version 4 UUID strings, as uuid.uuid4() gives),
+    reading the random bytes from the OS in blocks rather than once per id.
+    """
+    while True:
+        block = os.urandom(16 * 256)
+        for i in range(0, len(block), 16):
+            yield str(uuid.UUID(bytes=block[i:i + 16], version=4))
+
+@functools.lru_cache(maxsize=1024)
+def _pred_link_pattern(pred_id):
+    """
+    Compiled pattern for one predecessor link in a predecessor string: the id (matched
+    literally) with an optional relation type and lag, e.g. "2", "2FS", "2SS+2d".
+    """
+    return re.compile(rf"\b{re.escape(str(pred_id))}(?:FS|SS|FF|SF)?(?:\+\d+d|-\d+d)?\b")
+
+def _first_match(df, col, value):
+    """
+    Position of the first row whose col equals value as a string, or None.
+    Reads the position straight from the mask (no filtered copy of df).
+    """
+    mask = (df[col].astype(str) == str(value)).to_numpy()
+    if not mask.any():
+        return None
+    return int(mask.argmax())
+
+def _float_values(df, col, default):
+    """
+    Column as a list of floats, read the way a per-row float(value) would be: numbers and
+    numeric strings convert, NaN stays NaN, anything float() rejects (None, text) gives default.
+    A missing column is all default.
+    """
+    if col not in df.columns:
+        return [default] * len(df)
+    raw = df[col]
+    vals = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=float)
+    # Only the cells to_numeric could not read go through float() one by one
+    for pos in np.flatnonzero(np.isnan(vals)):
+        try:
+            vals[pos] = float(raw.iat[pos])
+        except Exception:
+            vals[pos] = default
+    return vals.tolist()
+
+def _activity_positions(df):
     """
-    Creates a deep copy of the schedule dataframe for the recovery workspace.
+    Maps each activity id (as a string) to the position of its first row in df,
+    the same row _first_match would find.
+    """
+    act_pos = {}
+    for pos, key in enumerate(df["activity_id"].astype(str)):
+        act_pos.setdefault(key, pos)
+    return act_pos
+
+def init_recovery_workspace(df_schedule, downcast=False):
+    """
+    Creates a copy of the schedule dataframe for the recovery workspace.
     Adds audit columns.
+    Only the columns apply_action edits in place (_WORKSPACE_EDITED_COLUMNS) are copied;
+    the rest share memory with df_schedule, so workspace code must replace those columns
+    whole (ws[col] = ...) rather than edit their cells.
+    With downcast=True the rules' numeric inputs (_WORKSPACE_FLOAT32_COLUMNS) are stored as
+    float32, half the memory of float64 (values go through pd.to_numeric, so text becomes NaN).
     """
     if df_schedule is None or df_schedule.empty:
         return pd.DataFrame()
         
-    recovery_df = df_schedule.copy(deep=True)
+    recovery_df = df_schedule.copy(deep=False)
+    for col in _WORKSPACE_EDITED_COLUMNS:
+        if col in recovery_df.columns:
+            recovery_df[col] = df_schedule[col].copy()
+    
+    # Resource and project ids repeat a few values across many activities: store
+    # them as categoricals (integer codes per row, each distinct value stored once).
+    # apply_action adds a category before swapping in a new resource.
+    for col in ["resource_id", "project_name"]:
+        if col in recovery_df.columns:
+            recovery_df[col] = recovery_df[col].astype("category")
+    
+    if downcast:
+        for col in _WORKSPACE_FLOAT32_COLUMNS:
+            if col in recovery_df.columns:
+                recovery_df[col] = pd.to_numeric(recovery_df[col], errors="coerce").astype("float32")
     
     # Initialize audit columns if not present
     if "last_change_type" not in recovery_df.columns:
@@ -30,46 +145,128 @@ def init_recovery_workspace(df_schedule):
         
     return recovery_df
 
-def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
+def generate_actions(df_schedule, resource_stats, df_resource, root_causes, as_frame=False):
     """
     Generates potential recovery actions based on diagnosis (root causes) and rule constraints.
-    Returns a list of action dictionaries.
+    Returns a list of action dictionaries, or with as_frame=True a DataFrame of
+    ACTION_COLUMNS (one row per action, fields an action lacks are None).
     """
     actions = []
+    action_ids = _action_ids()
     
     # Pre-process Root Causes for quick lookup
     # Map Activity ID -> Root Cause Category
     rc_map = {}
     if not root_causes.empty:
-        # Assuming 'Activity' column exists in root_causes
-        for _, row in root_causes.iterrows():
-            rc_map[row.get("Activity")] = row.get("Root Cause Category")
+        # Assuming 'Activity' column exists in root_causes (later rows win, as before)
+        def rc_col(col):
+            return root_causes[col].tolist() if col in root_causes.columns else [None] * len(root_causes)
+        rc_map = dict(zip(rc_col("Activity"), rc_col("Root Cause Category")))
 
     if not df_schedule.empty:
         # Ensure Numeric Rates in Resource DF once
         if df_resource is not None:
              df_resource["resource_rate"] = pd.to_numeric(df_resource["resource_rate"], errors='coerce').fillna(0.0)
+             
+             # Resource details, prepared once per resource row (current resource and Rule A candidates)
+             res_id_arr = df_resource["resource_id"].to_numpy()
+             res_ids = res_id_arr.tolist()
+             res_rates = df_resource["resource_rate"].to_numpy(dtype=float)
+             # Rows ordered by rate, so "cheaper than X" is a prefix found by binary search
+             rate_order = np.argsort(res_rates, kind="stable")
+             sorted_rates = res_rates[rate_order]
+             res_names = df_resource["resource_name"].tolist() if "resource_name" in df_resource.columns else None
+             res_max_fte = df_resource["resource_max_fte"].tolist() if "resource_max_fte" in df_resource.columns else [1.0] * len(df_resource)
+             # Stripped string id -> first row, for the current-resource lookup
+             res_pos_by_key = {}
+             for res_pos, key in enumerate(df_resource["resource_id"].astype(str).str.strip()):
+                 res_pos_by_key.setdefault(key, res_pos)
+             res_skills = [_parse_skills(v) for v in df_resource["resource_skills"]] if "resource_skills" in df_resource.columns else [set()] * len(df_resource)
+             # Same skills as a 0/1 matrix (resource row x skill), so the overlap with the current
+             # resource's skills is one matrix-vector product over all candidates
+             skill_cols = {}
+             res_skill_mat = np.zeros((len(df_resource), 0), dtype=np.int64)
+             for skills in res_skills:
+                 for skill in skills:
+                     skill_cols.setdefault(skill, len(skill_cols))
+             if skill_cols:
+                 res_skill_mat = np.zeros((len(df_resource), len(skill_cols)), dtype=np.int64)
+                 for res_pos, skills in enumerate(res_skills):
+                     res_skill_mat[res_pos, [skill_cols[skill] for skill in skills]] = 1
+             res_hours = df_resource["resource_working_hours"].tolist() if "resource_working_hours" in df_resource.columns else [8.0] * len(df_resource)
 
-        for idx, act_row in df_schedule.iterrows():
+        # Planned intervals, parsed once and bucketed per resource for the Rule A availability check
+        # (unreadable dates never count as overlapping)
+        def plan_dates(col):
+            if col not in df_schedule.columns:
+                return np.full(len(df_schedule), np.datetime64("NaT"), dtype="datetime64[ns]")
+            raw = df_schedule[col]
+            dates = pd.to_datetime(raw, errors="coerce", format="ISO8601")
+            retry = dates.isna() & raw.notna()
+            if retry.any():
+                dates[retry] = pd.to_datetime(raw[retry], errors="coerce", format="mixed")
+            return dates.to_numpy()
+        
+        # As int64 ns; unreadable starts sort after every date and unreadable finishes before.
+        plan_start = plan_dates("planned_start")
+        plan_finish = plan_dates("planned_finish")
+        start_ns = np.where(np.isnat(plan_start), np.iinfo(np.int64).max, plan_start.view(np.int64))
+        finish_ns = np.where(np.isnat(plan_finish), np.iinfo(np.int64).min, plan_finish.view(np.int64))
+        # Per resource: task starts in ascending order with the running max of their finishes,
+        # so "some task starts before X and finishes after Y" is one binary search.
+        busy_by_res = {}
+        if "resource_id" in df_schedule.columns:
+            for rid, rows in df_schedule.groupby("resource_id", sort=False, observed=True).indices.items():
+                order = np.argsort(start_ns[rows], kind="stable")
+                busy_by_res[rid] = (start_ns[rows][order], np.maximum.accumulate(finish_ns[rows][order]))
+
+        # --- Global Filter: Skip Completed Tasks ---
+        # (any actual_finish other than blank / NaN / NaT / None), decided for all rows at once
+        if "actual_finish" in df_schedule.columns:
+            fin_str = df_schedule["actual_finish"].astype(str).str.lower()
+            completed = ((fin_str != "") & ~fin_str.isin(["nan", "nat", "none"])).to_numpy()
+        else:
+            completed = np.zeros(len(df_schedule), dtype=bool)
+        open_rows = np.flatnonzero(~completed)
+        
+        # Numeric inputs of the rules, converted for all rows up front
+        fte_vals = _float_values(df_schedule, "fte_allocation", 0.0)
+        rem_durs = _float_values(df_schedule, "remaining_duration_days", 0.0)
+        plan_durs = _float_values(df_schedule, "planned_duration", 0.0)
+        delays_in = _float_values(df_schedule, "delay_carried_in", 0.0)
+        total_floats = _float_values(df_schedule, "total_float_days", 999.0)
+        
+        # --- Rule D inputs, for all rows at once ---
+        # Predecessor string per row ("predecessors", else "predecessor_id"), split into activity ids
+        # ("2FS; 3" -> "2", "3") and matched to the first row of that activity. The fast-track
+        # saving is the predecessor's planned duration minus the 2 day lag; per row keep the
+        # largest positive saving (first predecessor on ties).
+        fast_track_by_row = {}
+        act_pos = _activity_positions(df_schedule)
+        if "predecessors" in df_schedule.columns:
+            preds = df_schedule["predecessors"].astype(str)
+        else:
+            preds = pd.Series("", index=df_schedule.index)
+        fallback = df_schedule["predecessor_id"].astype(str) if "predecessor_id" in df_schedule.columns else ""
+        preds = preds.where(~preds.isin(["nan", ""]), fallback).reset_index(drop=True)
+        pred_ids = preds.str.findall(_PRED_ID_RE).explode().dropna()
+        links = pd.DataFrame({"row": pred_ids.index, "pred": pred_ids.to_numpy(), "pos": pred_ids.map(act_pos).to_numpy()})
+        links = links.dropna(subset=["pos"])
+        links["save"] = np.asarray(plan_durs)[links["pos"].to_numpy(dtype=int)] - 2
+        links = links[links["save"] > 0].reset_index(drop=True)
+        if not links.empty:
+            best = links.loc[links.groupby("row", sort=False)["save"].idxmax()]
+            fast_track_by_row = dict(zip(best["row"].tolist(), zip(best["save"].tolist(), best["pred"].tolist())))
+
+        # Rows as plain dicts (no per-row Series); the rules read fields by name with defaults
+        for pos, act_row in zip(open_rows, df_schedule.iloc[open_rows].to_dict("records")):
             act_id = act_row["activity_id"]
             proj_name = act_row.get("project_name", "Unknown Project")
-            
-            # --- Global Filter: Skip Completed Tasks ---
-            act_fin = str(act_row.get("actual_finish", ""))
-            if act_fin and act_fin.lower() != "nan" and act_fin.lower() != "nat" and act_fin.lower() != "none":
-                 continue
 
             # Gather Activity Metrics
             current_res = act_row.get("resource_id")
-            current_fte = 0.0
-            try:
-                current_fte = float(act_row.get("fte_allocation", 0))
-            except: pass
-            
-            rem_dur = 0.0
-            try:
-                rem_dur = float(act_row.get("remaining_duration_days", 0))
-            except: pass
+            current_fte = fte_vals[pos]
+            rem_dur = rem_durs[pos]
             
             on_crit = act_row.get("on_critical_path", False)
             
@@ -78,104 +275,85 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
             curr_res_name = "Unknown"
             max_fte = 1.0 # Default
             target_skills = set()
-            curr_res_row = pd.DataFrame()
+            curr_pos = None # Row of the current resource in df_resource
 
             if df_resource is not None and current_res and str(current_res).lower() != "nan" and current_res != 0:
                 try:
-                    res_str = str(current_res).strip()
-                    mask = df_resource["resource_id"].astype(str).str.strip() == res_str
-                    curr_res_row = df_resource[mask]
+                    curr_pos = res_pos_by_key.get(str(current_res).strip())
                     
-                    if not curr_res_row.empty:
-                        r_row = curr_res_row.iloc[0]
-                        curr_rate = float(r_row["resource_rate"])
-                        max_fte = float(r_row.get("resource_max_fte", 1.0))
-                        curr_res_name = r_row.get("resource_name", str(current_res))
+                    if curr_pos is not None:
+                        curr_rate = float(res_rates[curr_pos])
+                        max_fte = float(res_max_fte[curr_pos])
+                        curr_res_name = res_names[curr_pos] if res_names is not None else str(current_res)
                         
-                        ts_str = str(r_row.get("resource_skills", ""))
-                        if ts_str and ts_str.lower() != "nan":
-                             sep = ";" if ";" in ts_str else ","
-                             target_skills = set([s.strip() for s in ts_str.split(sep) if s.strip()])
+                        target_skills = res_skills[curr_pos]
                 except Exception:
                     pass
 
             # --- Rule A: Resource Optimization (Swap) ---
             # Trigger: Cheaper resource available with matching skills
-            if not curr_res_row.empty:
-                # Find Candidates
-                candidates = df_resource[(df_resource["resource_id"] != current_res) & (df_resource["resource_rate"] < curr_rate)]
-                for _, cand in candidates.iterrows():
-                     cand_id = cand["resource_id"]
-                     cand_name = cand.get("resource_name", cand_id)
-                     cand_rate = float(cand["resource_rate"])
-                     
-                     # Skill Match
-                     match_pct = 0
-                     cand_skills = set()
-                     cs_str = str(cand.get("resource_skills", ""))
-                     if cs_str and cs_str.lower() != "nan":
-                         sep = ";" if ";" in cs_str else ","
-                         cand_skills = set([s.strip() for s in cs_str.split(sep) if s.strip()])
-                    
-                     if not target_skills:
-                         match_pct = 100 
-                     else:
-                         overlap = target_skills.intersection(cand_skills)
-                         match_pct = int((len(overlap) / len(target_skills)) * 100)
-                         
-                     if match_pct < 60:
-                         continue
+            # (skipped outright when no resource is cheaper, e.g. unpriced resources at rate 0)
+            if curr_pos is not None and curr_rate > sorted_rates[0]:
+                # Find Candidates (other, cheaper resources)
+                act_start = start_ns[pos]
+                act_end = finish_ns[pos]
+                cheaper = np.sort(rate_order[:np.searchsorted(sorted_rates, curr_rate, side="left")]) # back in file order
+                cands = cheaper[res_id_arr[cheaper] != current_res]
+                
+                # Skill Match, for all candidates at once (at least 60% of the current skills)
+                if not target_skills:
+                    match_pcts = np.full(len(cands), 100)
+                else:
+                    overlap = res_skill_mat[cands] @ res_skill_mat[curr_pos]
+                    match_pcts = ((overlap / len(target_skills)) * 100).astype(int)
+                    cands = cands[match_pcts >= 60]
+                    match_pcts = match_pcts[match_pcts >= 60]
+                
+                total_dur = plan_durs[pos]
+                task_effort = None # Same for every candidate, worked out for the first available one
+                for c, match_pct in zip(cands, match_pcts.tolist()):
+                     cand_id = res_ids[c]
+                     cand_name = res_names[c] if res_names is not None else cand_id
+                     cand_rate = float(res_rates[c])
                          
-                     # Availability (Basic Overlap Check)
-                     is_busy = False
-                     try:
-                         act_start = pd.to_datetime(act_row["planned_start"])
-                         act_end = pd.to_datetime(act_row["planned_finish"])
-                         cand_tasks = df_schedule[df_schedule["resource_id"] == cand_id]
-                         for _, task in cand_tasks.iterrows():
-                             t_start = pd.to_datetime(task["planned_start"])
-                             t_end = pd.to_datetime(task["planned_finish"])
-                             if t_start < act_end and t_end > act_start:
-                                 is_busy = True
-                                 break
-                     except: pass
-                     
-                     if is_busy:
-                         continue
+                     # Availability (Basic Overlap Check against the candidate's planned tasks)
+                     if cand_id in busy_by_res:
+                         t_starts, t_max_end = busy_by_res[cand_id]
+                         n_before = np.searchsorted(t_starts, act_end, side="left") # tasks starting before act_end
+                         if n_before and t_max_end[n_before - 1] > act_start:
+                             continue
 
                      # Calculate Savings using effort-based approach
                      # Get task_planned_effort if available, otherwise calculate it
-                     task_effort = None
-                     total_dur = float(act_row.get("planned_duration", 0))
-                     
-                     if "task_planned_effort" in act_row.index and pd.notna(act_row.get("task_planned_effort")):
-                         task_effort = float(act_row.get("task_planned_effort"))
-                     else:
-                         # Calculate effort: planned_duration × old_resource_working_hours × fte
-                         old_work_hours = float(curr_res_row.iloc[0].get("resource_working_hours", 8.0)) if not curr_res_row.empty else 8.0
-                         if pd.isna(old_work_hours) or old_work_hours == 0:
-                             old_work_hours = 8.0
-                         task_effort = total_dur * old_work_hours * current_fte
+                     if task_effort is None:
+                         if "task_planned_effort" in act_row and pd.notna(act_row.get("task_planned_effort")):
+                             task_effort = float(act_row.get("task_planned_effort"))
+                         else:
+                             # Calculate effort: planned_duration × old_resource_working_hours × fte
+                             old_work_hours = float(res_hours[curr_pos])
+                             if pd.isna(old_work_hours) or old_work_hours == 0:
+                                 old_work_hours = 8.0
+                             task_effort = total_dur * old_work_hours * current_fte
                      
                      # Calculate savings: effort × (old_rate - new_rate)
                      savings = task_effort * (curr_rate - cand_rate)
                      
-                     # Calculate new duration for display (optional, for info)
-                     cand_work_hours = float(cand.get("resource_working_hours", 8.0))
-                     if pd.isna(cand_work_hours) or cand_work_hours == 0:
-                         cand_work_hours = 8.0
-                     new_dur = task_effort / (cand_work_hours * current_fte) if cand_work_hours * current_fte > 0 else total_dur
-                     duration_savings = total_dur - new_dur
-                     
                      if savings > 0:
-                         desc = f"Project: {proj_name} | Task: {act_row['activity_name']}\n"
-                         desc += f"Swap **{curr_res_name}** with **{cand_name}**.\n"
-                         desc += f"**Save ${savings:,.2f}** | Skill Match: {match_pct}%"
+                         # Calculate new duration for display (optional, for info)
+                         cand_work_hours = float(res_hours[c])
+                         if pd.isna(cand_work_hours) or cand_work_hours == 0:
+                             cand_work_hours = 8.0
+                         new_dur = task_effort / (cand_work_hours * current_fte) if cand_work_hours * current_fte > 0 else total_dur
+                         duration_savings = total_dur - new_dur
+                         
+                         desc = (f"Project: {proj_name} | Task: {act_row['activity_name']}\n"
+                                 f"Swap **{curr_res_name}** with **{cand_name}**.\n"
+                                 f"**Save ${savings:,.2f}** | Skill Match: {match_pct}%")
                          
                          story = f"**Trigger:** Found cheaper resource {cand_name} (${cand_rate:.1f}/hr) vs {curr_res_name} (${curr_rate:.1f}/hr). Skills match: {match_pct}%. Availability verified: {cand_name} is not assigned to any overlapping activities or projects during this task period, preventing overallocation."
                          
                          actions.append({
-                            "id": str(uuid.uuid4()),
+                            "id": next(action_ids),
                             "type": ACTION_RES_SWAP,
                             "activity_id": act_id,
                             "description": desc,
@@ -215,16 +393,38 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
                  new_remaining_cost = 0.0
                  
                  try:
-                     if not curr_res_row.empty:
-                         rate = float(curr_res_row.iloc[0].get("resource_rate", 0))
-                         work_hours = float(curr_res_row.iloc[0].get("resource_working_hours", 8))
+                     if curr_pos is not None:
+                         rate = float(res_rates[curr_pos])
+                         work_hours = float(res_hours[curr_pos])
                          
                          old_remaining_cost = rem_dur * work_hours * current_fte * rate
                          new_remaining_cost = new_dur * work_hours * max_fte * rate
                          cost_diff = new_remaining_cost - old_remaining_cost
                  except:
                      pass
-                 
+
+                 # Precompute the cost breakdown shown in the UI popover (static per action)
+                 old_total_hours = rem_dur * current_fte * work_hours
+                 new_total_hours = new_dur * max_fte * work_hours
+                 popover_md = (
+                     f"**Cost Calculation Details**\n\n"
+                     f"**Scenario:**\n\n"
+                     f"- **Old:** {rem_dur:.1f} days × {current_fte} FTE = {old_total_hours:.1f} total hours\n"
+                     f"- **New:** {new_dur:.1f} days × {max_fte} FTE = {new_total_hours:.1f} total hours\n\n"
+                     f"**Cost Calculation:**\n\n"
+                     f"- **Old Cost:** {rem_dur:.1f} days × {work_hours:.1f} hrs/day × {current_fte} FTE × ${rate:.2f}/hr = **${old_remaining_cost:,.2f}**\n"
+                     f"- **New Cost:** {new_dur:.1f} days × {work_hours:.1f} hrs/day × {max_fte} FTE × ${rate:.2f}/hr = **${new_remaining_cost:,.2f}**\n"
+                     f"- **Cost Difference:** **${cost_diff:,.2f}**"
+                 )
+                 if abs(cost_diff) <= 0.01:
+                     popover_md += (
+                         f"\n\n**Why Cost Stays the Same:**\n\n"
+                         f"When FTE increases and duration decreases proportionally:\n\n"
+                         f"- Total hours worked remain the same ({old_total_hours:.1f} hours in both cases)\n"
+                         f"- You're doing the same work, just faster\n"
+                         f"- Cost = Hours × Rate, so cost stays the same"
+                     )
+
                  desc = f"Project: {proj_name} | Task: {act_row['activity_name']}\n"
                  desc += f"Increase **{curr_res_name}** FTE: {current_fte} -> {max_fte}.\n"
                  desc += f"**Save {saved_days:.1f} Days** (Duration: {rem_dur:.1f}->{new_dur:.1f})."
@@ -233,7 +433,7 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
                           f"Increasing to max capacity (**{max_fte} FTE**) speeds up completion.")
                           
                  actions.append({
-                     "id": str(uuid.uuid4()),
+                     "id": next(action_ids),
                      "type": ACTION_FTE_ADJ,
                      "activity_id": act_id,
                      "description": desc,
@@ -243,7 +443,8 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
                          "old_dur": rem_dur, "new_dur": new_dur,
                          "saved_days": saved_days, "cost_impact": cost_diff,
                          "resource_rate": rate, "work_hours": work_hours,
-                         "old_cost": old_remaining_cost, "new_cost": new_remaining_cost
+                         "old_cost": old_remaining_cost, "new_cost": new_remaining_cost,
+                         "_popover_md": popover_md
                      },
                      "project_name": proj_name,
                      "resource_name": curr_res_name
@@ -259,8 +460,8 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
             act_fin = str(act_row.get("actual_finish", ""))
             is_finished = act_fin and (act_fin.lower() != "nan") and (act_fin.lower() != "nat")
             
-            delay_in = float(act_row.get("delay_carried_in", 0))
-            total_float = float(act_row.get("total_float_days", 999))
+            delay_in = delays_in[pos]
+            total_float = total_floats[pos]
             
             # Criticality check: Explicit flag OR Float <= 0
             is_critical_effective = on_crit or (total_float <= 0)
@@ -289,7 +490,7 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
                              f"Compressing this {'Active' if act_row.get('actual_start') else 'Planned'} task will help catch up.")
                     
                     actions.append({
-                        "id": str(uuid.uuid4()),
+                        "id": next(action_ids),
                         "type": ACTION_COMPRESS,
                         "activity_id": act_id,
                         "description": f"Compress Duration (Max Rec: {max_compress} days)",
@@ -299,7 +500,8 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
                             "old_dur": rem_dur,
                             "new_dur": new_dur_calc,
                             "delay_carried_in": delay_in,
-                            "planned_finish": act_row.get("planned_finish", "Unknown")
+                            "planned_finish": act_row.get("planned_finish", "Unknown"),
+                            "_node_id": _dag_node_id(act_id) # Resolved once for the successor preview
                         }
                     })
 
@@ -308,73 +510,32 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
             # Logic: Convert "Finish-to-Start" (FS) to "Start-to-Start" (SS) + Lag
             # Savings = Predecessor Duration - Lag
             
-            if on_crit:
-                  preds_str = str(act_row.get("predecessors", ""))
-                  # Normalize
-                  if preds_str == "nan" or not preds_str:
-                      preds_str = str(act_row.get("predecessor_id", ""))
-                  
-                  if preds_str and preds_str.lower() != "nan":
-                      # We need to know the Predecessor's Duration to calc savings.
-                      # We have 'max_pred_duration' helper? No.
-                      # Ideally we parse the predecessor ID string "2FS", "3".
-                      # For MVP, assume the primary predecessor is the critical driver.
-                      # We can't easily look up predecessor duration here without a lookup map.
-                      # But wait, we iterate `act_row`. We assume we have access to the full DF?
-                      # Yes, `df` is passed to `generate_actions`.
-                      
-                      # Quick Lookup for Predecessor Duration
-                      # Parse first predecessor for simplicity or max?
-                      # "2" or "2FS".
-                      import re
-                      p_ids = re.findall(r"(\d+)", preds_str)
-                      
-                      max_saving = 0
-                      best_pred = None
-                      
-                      for pid in p_ids:
-                          try:
-                              # Robust ID Lookup (Str Comparison)
-                              p_row = df_schedule[df_schedule["activity_id"].astype(str) == str(pid)]
-                              
-                              if not p_row.empty:
-                                  p_dur = float(p_row.iloc[0].get("planned_duration", 0))
-                                  # Savings = Duration - 2 (Lag).
-                                  # If duration is 5, SS+2 means we start 2 days after pred starts.
-                                  # VS starting 5 days after (FS).
-                                  # Saving = 5 - 2 = 3.
-                                  save = p_dur - 2
-                                  if save > max_saving:
-                                      max_saving = save
-                                      best_pred = pid
-                          except:
-                              pass
-                      
-                      if max_saving > 0:
-                          story = (f"Activity {act_id} waits for Activity {best_pred} to finish. "
-                                   f"Fast-tracking allows it to start 2 days after {best_pred} starts, "
-                                   f"saving {int(max_saving)} days.")
-                                   
-                          actions.append({
-                              "id": str(uuid.uuid4()),
-                              "type": ACTION_FAST_TRACK,
-                              "activity_id": act_id,
-                              "description": f"Fast-Track via SS+2d (Save ~{int(max_saving)} days)",
-                              "narrative": story,
-                              "parameters": {
-                                  "target_type": "SS", 
-                                  "lag": 2,
-                                  "estimated_savings": int(max_saving),
-                                  "related_pred_id": best_pred
-                              }
-                          })
+            if on_crit and pos in fast_track_by_row:
+                max_saving, best_pred = fast_track_by_row[pos] # saving > 0, from the Rule D inputs
+                story = (f"Activity {act_id} waits for Activity {best_pred} to finish. "
+                         f"Fast-tracking allows it to start 2 days after {best_pred} starts, "
+                         f"saving {int(max_saving)} days.")
+                         
+                actions.append({
+                    "id": next(action_ids),
+                    "type": ACTION_FAST_TRACK,
+                    "activity_id": act_id,
+                    "description": f"Fast-Track via SS+2d (Save ~{int(max_saving)} days)",
+                    "narrative": story,
+                    "parameters": {
+                        "target_type": "SS", 
+                        "lag": 2,
+                        "estimated_savings": int(max_saving),
+                        "related_pred_id": best_pred
+                    }
+                })
 
             # --- Rule E: Scope Deferral ---
             # Trigger: Known Cost Overrun or Risk (from Root Cause Map)
             rc_cat = rc_map.get(act_id)
             if rc_cat in ["Cost Overrun", "Risk / Uncertainty (Proxy)"]:
                 actions.append({
-                    "id": str(uuid.uuid4()),
+                    "id": next(action_ids),
                     "type": ACTION_DEFERRAL,
                     "activity_id": act_id,
                     "description": "Defer Scope (Remove from active calculation)",
@@ -403,7 +564,7 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
                           f"{'⚠️ Causes Resource Overload.' if is_overloaded else ''}")
                  
                  actions.append({
-                     "id": str(uuid.uuid4()),
+                     "id": next(action_ids),
                      "type": ACTION_CRASHING,
                      "activity_id": act_id,
                      "description": f"Crash Task (Double FTE{' - Overload' if is_overloaded else ''})",
@@ -416,9 +577,11 @@ def generate_actions(df_schedule, resource_stats, df_resource, root_causes):
                      }
                  })
             
+    if as_frame:
+        return pd.DataFrame({col: [a.get(col) for a in actions] for col in ACTION_COLUMNS}, columns=ACTION_COLUMNS)
     return actions
 
-def apply_action(df, action, df_resource=None):
+def apply_action(df, action, df_resource=None, act_pos=None):
     """
     Mutates df in place applying the action.
     Returns success (bool), message (str)
@@ -427,14 +590,19 @@ def apply_action(df, action, df_resource=None):
         df: DataFrame to modify
         action: Action dictionary with type and parameters
         df_resource: Optional resource DataFrame for looking up resource_working_hours
+        act_pos: Optional {str(activity_id): row position} map of df (see _activity_positions),
+            reused across calls instead of scanning the activity_id column each time
     """
     act_id = action.get("activity_id")
-    # Find row index (Robust String Comparison)
-    mask = df["activity_id"].astype(str) == str(act_id)
-    if not mask.any():
+    # Find row index (Robust String Comparison), first match
+    if act_pos is not None:
+        pos = act_pos.get(str(act_id))
+    else:
+        pos = _first_match(df, "activity_id", act_id)
+    if pos is None:
         return False, f"Activity {act_id} not found"
         
-    idx = df[mask].index[0]
+    idx = df.index[pos]
     
     # Log Metadata (Always set this first)
     df.at[idx, "last_change_type"] = action["type"]
@@ -442,6 +610,9 @@ def apply_action(df, action, df_resource=None):
     
     if action["type"] == ACTION_RES_SWAP:
         new_res = action["parameters"]["new_res"]
+        res_col = df["resource_id"]
+        if isinstance(res_col.dtype, pd.CategoricalDtype) and new_res not in res_col.cat.categories:
+            df["resource_id"] = res_col.cat.add_categories([new_res])
         df.at[idx, "resource_id"] = new_res
         
         # Recalculate duration based on task_planned_effort (effort-based approach)
@@ -458,9 +629,9 @@ def apply_action(df, action, df_resource=None):
                 # Look up new resource's working hours
                 new_work_hours = 8.0  # Default
                 if df_resource is not None:
-                    res_row = df_resource[df_resource["resource_id"].astype(str) == str(new_res)]
-                    if not res_row.empty:
-                        new_work_hours = float(res_row.iloc[0].get("resource_working_hours", 8.0))
+                    res_pos = _first_match(df_resource, "resource_id", new_res)
+                    if res_pos is not None:
+                        new_work_hours = float(df_resource.iloc[res_pos].get("resource_working_hours", 8.0))
                         if pd.isna(new_work_hours) or new_work_hours == 0:
                             new_work_hours = 8.0
                 
@@ -546,9 +717,8 @@ def apply_action(df, action, df_resource=None):
         if target_pred:
             # Simple Replace: "2" -> "2SS+2d". "2FS" -> "2SS+2d"
             # Regex to match target_pred followed by optional FS/SS etc
-            import re
             # Match strict ID
-            pattern = re.compile(rf"\b{target_pred}(?:FS|SS|FF|SF)?(?:\+\d+d|-\d+d)?\b")
+            pattern = _pred_link_pattern(target_pred)
             
             new_preds = pattern.sub(f"{target_pred}SS+2d", current_preds)
             df.at[idx, "predecessor_id"] = new_preds
@@ -587,3 +757,14 @@ def apply_action(df, action, df_resource=None):
         return True, f"Crashed task! FTE doubled to {new_fte}. Duration halved."
         
     return False, "Unknown Action Type"
+
+def apply_actions(df, actions, df_resource=None):
+    """
+    Applies a list of actions to df in place, in order (later actions see the earlier changes).
+    The activity id -> row map is built once for the whole list instead of per action.
+    Returns a list of (success, message), one per action.
+    """
+    if df is None or df.empty or "activity_id" not in df.columns:
+        return [(False, f"Activity {a.get('activity_id')} not found") for a in actions]
+    act_pos = _activity_positions(df)
+    return [apply_action(df, action, df_resource, act_pos=act_pos) for action in actions]
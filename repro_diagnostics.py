@@ -22,6 +22,12 @@ def run_test():
     print("Schedule 'resource_id':", df_schedule["resource_id"].dtype)
     print("Resource 'resource_id':", df_resource["resource_id"].dtype)
 
+    # Resource and project ids repeat across many activities: group and dedupe them on
+    # categorical codes (activity ids are unique per row, so they stay as loaded)
+    for col in ["resource_id", "project_id"]:
+        if col in df_schedule.columns:
+            df_schedule[col] = df_schedule[col].astype("category")
+
     # Mimic Cost Engine (mock cost_df_results)
     # We assume cost engine output connects activity_id and resource_id
     # for testing, we just merge schedule and resource manually to get assignments
@@ -36,7 +42,7 @@ def run_test():
     
     # 1. unique assignments
     res_activity_map = {}
-    for rid, grp in cost_df_results.groupby("resource_id"):
+    for rid, grp in cost_df_results.groupby("resource_id", observed=True):
         res_activity_map[str(rid)] = grp["activity_id"].unique().tolist()
         
     print(f"Map created for {len(res_activity_map)} resources.")
@@ -46,6 +52,27 @@ def run_test():
     # we'll just iterate df_resource IDs
     resource_ids = df_resource["resource_id"].unique()
     
+    # 2. Project IDs per resource, for all resources in one join:
+    # (resource, assigned activity) pairs matched to schedule rows on the activity id as text,
+    # projects kept in schedule row order like the app's per-resource isin filter
+    proj_map = {}
+    if "project_id" in df_schedule.columns:
+        pairs = pd.DataFrame([(key, str(a)) for key, acts in res_activity_map.items() for a in acts],
+                             columns=["_rid", "_aid"])
+        sched_keys = pd.DataFrame({"_aid": df_schedule["activity_id"].astype(str),
+                                   "project_id": df_schedule["project_id"].to_numpy(),
+                                   "_row": np.arange(len(df_schedule))})
+        rel = pairs.merge(sched_keys, on="_aid").drop_duplicates(["_rid", "_row"])
+        rel = rel.sort_values("_row", kind="stable").dropna(subset=["project_id"])
+        for key, projs in rel.groupby("_rid", sort=False)["project_id"]:
+            proj_map[key] = ", ".join(map(str, projs.unique()))
+    
+    # 3. Resource names: id (as text) -> name on its first row
+    name_map = {}
+    if "resource_name" in df_resource.columns:
+        for key, name in zip(df_resource["resource_id"].astype(str), df_resource["resource_name"]):
+            name_map.setdefault(key, name)
+    
     for rid in resource_ids:
         print(f"\nChecking Resource: {rid} (Type: {type(rid)})")
         
@@ -54,22 +81,12 @@ def run_test():
         
         # 2. Lookup Project IDs
         proj_str = "None"
-        if assignments:
-            # Logic from app.py
-            # "activity_id".astype(str).isin([str(x) for x in assignments])
-            rel_df = df_schedule[df_schedule["activity_id"].astype(str).isin([str(x) for x in assignments])]
-            if "project_id" in rel_df.columns:
-                 unique_projs = rel_df["project_id"].dropna().unique()
-                 proj_str = ", ".join(map(str, unique_projs))
+        if assignments and "project_id" in df_schedule.columns:
+            proj_str = proj_map.get(str(rid), "")
         print(f"  Project ID Found: '{proj_str}'")
         
         # 3. Lookup Resource Name
-        r_name = "Unknown"
-        # Logic from app.py
-        # df_resource["resource_id"].astype(str) == str(rid)
-        r_row = df_resource[df_resource["resource_id"].astype(str) == str(rid)]
-        if not r_row.empty:
-            r_name = r_row.iloc[0].get("resource_name", "Unknown")
+        r_name = name_map.get(str(rid), "Unknown")
         
         print(f"  Resource Name Found: '{r_name}'")
 
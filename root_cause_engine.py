@@ -18,123 +18,126 @@ def execute_root_cause_analysis(df_schedule, resource_stats):
     [Activity, Root Cause Category, Impact Days, Impact Cost, Cause Certainty, Explanation]
     Ranked by Impact.
     """
-    results = []
-    
     if df_schedule.empty:
         return pd.DataFrame()
 
-    def get_val(row, col, default=0):
-        val = row.get(col)
-        if pd.isna(val) or val == "":
-            return default
-        return val
-
-    for idx, row in df_schedule.iterrows():
-        # Extracted metrics
-        on_crit = get_val(row, "on_critical_path", False)
-        task_created_delay = float(get_val(row, "task_created_delay", 0))
-        total_float = float(get_val(row, "total_float_days", 0))
-        total_sched_delay = float(get_val(row, "total_schedule_delay", 0))
-        
-        resource_id = get_val(row, "resource_id", None)
-        
-        planned_cost = float(get_val(row, "planned_cost", 0))
-        actual_cost = float(get_val(row, "actual_cost", 0))
-        
-        remaining_duration = float(get_val(row, "remaining_duration_days", 0))
-        
-        # Determine Resource Overload status
-        # resource_stats is { rid: { 'overload_days_count': N, ... } }
-        res_overload_days = 0
-        if resource_id and str(resource_id) in resource_stats:
-            res_overload_days = resource_stats[str(resource_id)].get("overload_days_count", 0)
-            
-        # Defaults
-        category = None
-        certainty = None
-        explanation = ""
-        impact_days = 0
-        
-        # Calculate Cost Impact globally (if valid numbers)
-        # Impact Cost = Actual - Planned (if > 0, i.e., Overrun)
-        # User might want to see Underrun? "Impact Cost" usually implies negative impact.
-        # Let's stick to Overrun > 0.
-        cost_variance = actual_cost - planned_cost
-        impact_cost = max(0.0, cost_variance)
-        
-        # --- Rule Hierarchy ---
-        
-        # 1. Critical Path Slippage
-        if on_crit and task_created_delay > 0:
-            category = CAT_CRITICAL_SLIP
-            certainty = CERTAINTY_DIRECT
-            impact_days = task_created_delay
-            explanation = f"Critical task created {task_created_delay} days of delay."
-            
-        # --- Rule 3: Resource Overallocation ---
-        # Trigger: resource_id exists and is in overload dict
-        elif resource_id and str(resource_id) in resource_stats:
-            overload_days = resource_stats[str(resource_id)]["overload_days_count"]
-            if overload_days > 0:
-                 res_name = resource_stats[str(resource_id)]["resource_name"]
-                 category = CAT_RES_OVERLOAD
-                 certainty = CERTAINTY_DIRECT
-                 impact_days = remaining_duration # Impact is potential delay due to unavailability
-                 explanation = f"Assigned resource '{res_name}' is overloaded by {overload_days} days."
-            else:
-                 # No delay yet -> Risk?
-                 pass 
-                 
-        # 4. Cost Overrun
-        if category is None: # Only if not yet classified
-            if impact_cost > 0:
-                category = CAT_COST_OVERRUN
-                certainty = CERTAINTY_DIRECT
-                # impact_cost already set
-                explanation = f"Actual cost exceeds planned by ${impact_cost:,.2f}."
-                
-        # 5. Risk / Uncertainty
-        if category is None:
-            # Check criteria: High remaining, High cost exp, Low float.
-            # "AND ALL are true"
-            # Define thresholds
-            HIGH_REM_DUR = 10 # heuristic
-            HIGH_COST_EXP = 1000 # heuristic
-            LOW_FLOAT = 5 # heuristic
-            
-            # Cost Exposure = Remaining Cost? Or Planned? "High cost exposure".
-            remaining_cost = float(get_val(row, "remaining_cost", 0))
-            
-            if (remaining_duration > HIGH_REM_DUR and 
-                remaining_cost > HIGH_COST_EXP and 
-                total_float < LOW_FLOAT):
-                
-                category = CAT_RISK
-                certainty = CERTAINTY_INFERRED
-                explanation = "High risk profile: Long duration, high cost, low float."
-        
-        # If still None? (e.g. On Time, On Budget, No Risk).
-        # We only output "Why is this activity contributing...".
-        # If it's NOT contributing, maybe we exclude it?
-        # But "Each activity must be assigned exactly ONE category." 
-        #Implies valid classification for problem tasks. 
-        # Tasks that are fine -> "No Issue"?
-        # "First match wins".
-        # If none match, return "On Track" or exclude from "Root Cause" list?
-        # "Root Cause Summary Table (ranked)". Usually implies showing the PROBLEMS.
-        # But for completeness let's label them "On Track" but filter out later if needed.
-        
-        if category:
-            results.append({
-                "Activity": row["activity_id"],
-                "Root Cause Category": category,
-                "Impact Days": impact_days,
-                "Impact Cost": impact_cost,
-                "Cause Certainty": certainty,
-                "Explanation": explanation,
-                # For sorting
-                "_sort_certainty": 3 if certainty == CERTAINTY_DIRECT else (2 if certainty == CERTAINTY_INDIRECT else 1)
-            })
+    # Columns are read once each. Missing, blank ("") or NaN cells take the default,
+    # numbers are read as float (text that is not a number counts as 0).
+    def blank_mask(col):
+        raw = df_schedule[col]
+        return (raw.isna() | (raw == "")).to_numpy()
+
+    def num_col(col):
+        if col not in df_schedule.columns:
+            return np.zeros(len(df_schedule))
+        return pd.to_numeric(df_schedule[col], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    def truthy_col(col):
+        if col not in df_schedule.columns:
+            return np.zeros(len(df_schedule), dtype=bool)
+        return df_schedule[col].astype(bool).to_numpy() & ~blank_mask(col)
+
+    # Extracted metrics
+    on_crit = truthy_col("on_critical_path")
+    task_created_delay = num_col("task_created_delay")
+    total_float = num_col("total_float_days")
+    planned_cost = num_col("planned_cost")
+    actual_cost = num_col("actual_cost")
+    remaining_duration = num_col("remaining_duration_days")
+    remaining_cost = num_col("remaining_cost")
+
+    # Resource key per row (as a string), and whether resource_stats has an entry for it
+    # resource_stats is { rid: { 'overload_days_count': N, ... } }
+    res_col = df_schedule["resource_id"] if "resource_id" in df_schedule.columns else None
+    if isinstance(getattr(res_col, "dtype", None), pd.CategoricalDtype):
+        # Categorical ids (e.g. the recovery workspace): work per category, spread by code
+        codes = res_col.cat.codes.to_numpy()
+        cats = res_col.cat.categories
+        cat_keys = np.append(cats.astype(str).to_numpy(dtype=object), None) # code -1 (missing) -> None
+        cat_has_stats = np.append(np.array([bool(c) for c in cats], dtype=bool) & cats.astype(str).isin(list(resource_stats)), False)
+        res_keys = cat_keys[codes]
+        has_stats = cat_has_stats[codes] & ~blank_mask("resource_id")
+    elif res_col is not None:
+        res_keys = res_col.astype(str)
+        has_stats = truthy_col("resource_id") & res_keys.isin(list(resource_stats)).to_numpy()
+        res_keys = res_keys.to_numpy()
+    else:
+        res_keys = np.full(len(df_schedule), None)
+        has_stats = np.zeros(len(df_schedule), dtype=bool)
+
+    # Calculate Cost Impact globally (if valid numbers)
+    # Impact Cost = Actual - Planned (if > 0, i.e., Overrun)
+    # User might want to see Underrun? "Impact Cost" usually implies negative impact.
+    # Let's stick to Overrun > 0.
+    cost_variance = actual_cost - planned_cost
+    impact_cost = np.where(cost_variance > 0, cost_variance, 0.0)
+
+    # --- Rule Hierarchy (first match wins) ---
+
+    # 1. Critical Path Slippage
+    is_slip = on_crit & (task_created_delay > 0)
+
+    # --- Rule 3: Resource Overallocation ---
+    # Trigger: resource_id exists and is in overload dict. The counts are read once per
+    # resource, then spread over the rows with one hashtable map.
+    res_rows = np.flatnonzero(~is_slip & has_stats)
+    overload_by_key = pd.Series({k: resource_stats[k]["overload_days_count"] for k in pd.unique(res_keys[res_rows])},
+                                dtype=object)
+    overload_days = np.zeros(len(df_schedule), dtype=object)
+    overload_days[res_rows] = pd.Series(res_keys[res_rows], dtype=object).map(overload_by_key).to_numpy()
+    is_overload = np.zeros(len(df_schedule), dtype=bool)
+    is_overload[res_rows] = overload_days[res_rows] > 0
+    name_by_key = {k: resource_stats[k]["resource_name"] for k in pd.unique(res_keys[is_overload])}
+
+    # 4. Cost Overrun (only if not yet classified)
+    is_cost = ~(is_slip | is_overload) & (impact_cost > 0)
+
+    # 5. Risk / Uncertainty
+    # Check criteria: High remaining, High cost exp, Low float.
+    # "AND ALL are true"
+    # Define thresholds
+    HIGH_REM_DUR = 10 # heuristic
+    HIGH_COST_EXP = 1000 # heuristic
+    LOW_FLOAT = 5 # heuristic
+    # Cost Exposure = Remaining Cost? Or Planned? "High cost exposure".
+    is_risk = (~(is_slip | is_overload | is_cost) & (remaining_duration > HIGH_REM_DUR) &
+               (remaining_cost > HIGH_COST_EXP) & (total_float < LOW_FLOAT))
+
+    # Activities matching no rule (On Time, On Budget, No Risk) are not contributing: left out.
+    rows = np.flatnonzero(is_slip | is_overload | is_cost | is_risk)
+    if len(rows) == 0:
+        return pd.DataFrame()
+
+    category = np.select([is_slip, is_overload, is_cost], [CAT_CRITICAL_SLIP, CAT_RES_OVERLOAD, CAT_COST_OVERRUN],
+                         default=CAT_RISK)[rows]
+    certainty = np.where(is_risk, CERTAINTY_INFERRED, CERTAINTY_DIRECT)[rows]
+    # Impact is the created delay, or for an overloaded resource the potential delay due to
+    # unavailability (remaining duration); 0 otherwise (an int column if no row has days)
+    impact_days = np.where(is_slip, task_created_delay, np.where(is_overload, remaining_duration, 0.0))[rows]
+    if not (is_slip | is_overload)[rows].any():
+        impact_days = impact_days.astype(int)
+
+    explanations = []
+    for pos, cat in zip(rows.tolist(), category.tolist()):
+        if cat == CAT_CRITICAL_SLIP:
+            explanations.append(f"Critical task created {task_created_delay[pos].item()} days of delay.")
+        elif cat == CAT_RES_OVERLOAD:
+            explanations.append(f"Assigned resource '{name_by_key[res_keys[pos]]}' is overloaded by {overload_days[pos]} days.")
+        elif cat == CAT_COST_OVERRUN:
+            explanations.append(f"Actual cost exceeds planned by ${impact_cost[pos].item():,.2f}.")
+        else:
+            explanations.append("High risk profile: Long duration, high cost, low float.")
+
+    results = {
+        "Activity": df_schedule["activity_id"].to_numpy()[rows].tolist(),
+        "Root Cause Category": category,
+        "Impact Days": impact_days,
+        "Impact Cost": impact_cost[rows],
+        "Cause Certainty": certainty,
+        "Explanation": explanations,
+        # For sorting
+        "_sort_certainty": np.where(certainty == CERTAINTY_DIRECT, 3, np.where(certainty == CERTAINTY_INDIRECT, 2, 1))
+    }
 
     # Ranking Logic
     # 1. impact_days (desc)
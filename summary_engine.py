@@ -197,14 +197,15 @@ def generate_resource_summary(df_schedule, df_resource, resource_stats, generate
         if overloaded_resources:
             overloaded_resources.sort(key=lambda x: x[1], reverse=True)
             top_overloaded = overloaded_resources[:3]
+            # Resource id (as text) -> name on its first row, built once for the lookups below
+            name_by_id = {}
+            if df_resource is not None and "resource_id" in df_resource.columns and "resource_name" in df_resource.columns:
+                for rid, name in zip(df_resource["resource_id"].astype(str), df_resource["resource_name"]):
+                    name_by_id.setdefault(rid, name)
             overload_items = []
             for res_id, days in top_overloaded:
                 # Try to get resource name
-                res_name = str(res_id)
-                if df_resource is not None and "resource_id" in df_resource.columns:
-                    res_row = df_resource[df_resource["resource_id"].astype(str) == str(res_id)]
-                    if not res_row.empty and "resource_name" in res_row.columns:
-                        res_name = res_row.iloc[0].get("resource_name", str(res_id))
+                res_name = name_by_id.get(str(res_id), str(res_id))
                 overload_items.append(f"**{res_name}** ({days:.0f}d overload)")
             
             summary_parts.append(f"⚠️ **{len(overloaded_resources)} resource(s)** are overallocated: {', '.join(overload_items)}.")
@@ -283,15 +284,16 @@ def generate_cost_summary(df_schedule, cost_df_results):
         overruns = cost_df_results[cost_df_results["cost_variance"] > 1000]
         if len(overruns) > 0:
             top_overruns = overruns.nlargest(3, "cost_variance")
+            # Activity id (as text) -> project on its first row, built once for the lookups below
+            proj_by_act = {}
+            if "activity_id" in df_schedule.columns and "project_name" in df_schedule.columns:
+                for aid, proj in zip(df_schedule["activity_id"].astype(str), df_schedule["project_name"]):
+                    proj_by_act.setdefault(aid, proj)
             overrun_items = []
             for _, row in top_overruns.iterrows():
                 act_id = row.get("activity_id", "Unknown")
                 var = row.get("cost_variance", 0)
-                proj_name = "Unknown"
-                if "activity_id" in df_schedule.columns:
-                    act_row = df_schedule[df_schedule["activity_id"].astype(str) == str(act_id)]
-                    if not act_row.empty and "project_name" in act_row.columns:
-                        proj_name = act_row.iloc[0].get("project_name", "Unknown")
+                proj_name = proj_by_act.get(str(act_id), "Unknown")
                 overrun_items.append(f"**{proj_name} - Activity {act_id}** (${var:,.0f} overrun)")
             
             if overrun_items:
@@ -34,6 +34,23 @@ class TestCostEngine(unittest.TestCase):
         self.assertEqual(row["actual_cost"], 1600) # 2*8*1*100
         self.assertEqual(row["eac_cost"], 4000) # (2+3)*...
 
+    def test_blank_inputs_count_as_zero(self):
+        # Act 2 has no actual duration and a blank FTE; Act 3 has no matching resource.
+        df_sched = pd.DataFrame([
+            {"activity_id": 1, "resource_id": "R1", "planned_duration": 5, "actual_duration": 2, "remaining_duration_days": 3, "fte_allocation": 1.0},
+            {"activity_id": 2, "resource_id": "R1", "planned_duration": 4, "actual_duration": None, "remaining_duration_days": 4, "fte_allocation": ""},
+            {"activity_id": 3, "resource_id": "R9", "planned_duration": 2, "actual_duration": 0, "remaining_duration_days": 2, "fte_allocation": 1.0}
+        ])
+        df_res = pd.DataFrame([{"resource_id": "R1", "resource_rate": 100, "resource_working_hours": 8, "resource_max_fte": 1.0}])
+        
+        res_df = cost_engine.calculate_costs(df_sched, df_res).set_index("activity_id")
+        
+        self.assertEqual(res_df.loc[1, "planned_cost"], 4000)
+        self.assertEqual(res_df.loc[2, "planned_cost"], 0) # Blank FTE
+        self.assertEqual(res_df.loc[2, "fte_allocation"], 0)
+        self.assertEqual(res_df.loc[3, "eac_cost"], 0) # No rate found
+        self.assertEqual(res_df.loc[3, "resource_max_fte"], 0)
+
     def test_resource_overload(self):
         # R1 Max FTE 1.0
         # Act 1: Mon-Fri. 1.0 FTE.
@@ -64,5 +81,22 @@ class TestCostEngine(unittest.TestCase):
         self.assertEqual(r1_stats["overload_days_count"], 1) # Only Monday is 1.5
         self.assertEqual(r1_stats["peak_fte"], 1.5)
 
+    def test_resource_overload_skips_weekends(self):
+        # R1 Max FTE 1.0, two 0.6 FTE tasks overlapping Fri-Mon (weekend not counted).
+        # R2 only has a task that finishes before it starts -> listed with no load.
+        cost_df = pd.DataFrame([
+            {"resource_id": "R1", "resource_max_fte": 1.0, "forecast_start_date": "2023-01-04", "forecast_finish_date": "2023-01-09", "fte_allocation": 0.6},
+            {"resource_id": "R1", "resource_max_fte": 1.0, "forecast_start_date": "2023-01-06", "forecast_finish_date": "2023-01-10", "fte_allocation": 0.6},
+            {"resource_id": "R2", "resource_max_fte": 1.0, "forecast_start_date": "2023-01-10", "forecast_finish_date": "2023-01-02", "fte_allocation": 1.0},
+            {"resource_id": "0", "resource_max_fte": 1.0, "forecast_start_date": "2023-01-02", "forecast_finish_date": "2023-01-06", "fte_allocation": 5.0}
+        ])
+        
+        stats = cost_engine.check_resource_availability(cost_df)
+        
+        self.assertEqual(list(stats), ["R1", "R2"])
+        self.assertEqual(stats["R1"]["overload_days_count"], 2) # Fri 6th + Mon 9th
+        self.assertAlmostEqual(stats["R1"]["peak_fte"], 1.2)
+        self.assertEqual(stats["R2"], {"overload_days_count": 0, "peak_fte": 0})
+
 if __name__ == '__main__':
     unittest.main()
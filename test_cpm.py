@@ -135,5 +135,26 @@ class TestCalendarLogic(unittest.TestCase):
         self.assertEqual(res[1]["ES_date"], "2023-01-02")
         self.assertEqual(res[1]["EF_date"], "2023-01-02")
 
+    def test_repeat_run_returns_fresh_results(self):
+        # Same inputs are served from the cache; results must still be independent copies
+        data = {
+            "activity_id": [1, 2],
+            "planned_start": ["2023-01-02", "2023-01-02"], 
+            "planned_finish": ["2023-01-06", "2023-01-06"],
+            "predecessor_id": ["", "1FS"]
+        }
+        df = pd.DataFrame(data)
+        G, _ = build_dag_and_validate(df)
+        
+        first = cpm_engine.run_cpm(df, G)
+        first[2]["ES"] = 99
+        second = cpm_engine.run_cpm(df, G)
+        self.assertEqual(second[2]["ES"], 5)
+        
+        # A changed duration is not served from the stale entry
+        df.loc[0, "planned_finish"] = "2023-01-03" # 2 days
+        third = cpm_engine.run_cpm(df, G)
+        self.assertEqual(third[2]["ES"], 2)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import pandas as pd
 import networkx as nx
-from dag_engine import parse_dependency_string, build_dag_and_validate
+from dag_engine import parse_dependency_string, build_dag_and_validate, topological_order
 
 class TestDagEngine(unittest.TestCase):
 
@@ -45,6 +45,28 @@ class TestDagEngine(unittest.TestCase):
         self.assertEqual(val[3], "OK")
         self.assertTrue(nx.is_directed_acyclic_graph(G))
 
+    def test_topological_order(self):
+        df = pd.DataFrame({"activity_id": [1, 2, 3], "predecessor_id": ["", "1FS", "2FS;1FS"]})
+        G, _ = build_dag_and_validate(df)
+        self.assertEqual(topological_order(G), [1, 2, 3])
+        
+        # Each call reflects the graph as it is now
+        G.add_edge(3, 1)
+        self.assertIsNone(topological_order(G))
+
+    def test_topological_order_after_edge_swap(self):
+        # Swapping an edge keeps node/edge counts; the order must still be redone
+        G = nx.DiGraph([(1, 2), (2, 3)])
+        self.assertEqual(topological_order(G), [1, 2, 3])
+        
+        G.remove_edge(2, 3)
+        G.add_edge(3, 1)
+        self.assertEqual(topological_order(G), [3, 1, 2])
+        
+        G.remove_edge(3, 1)
+        G.add_edge(2, 1) # 1 -> 2 -> 1: cyclic, same counts again
+        self.assertIsNone(topological_order(G))
+
     def test_cycle_detection(self):
         # 1->2, 2->1
         data = {
@@ -62,6 +62,31 @@ class TestEVM(unittest.TestCase):
         m1 = evm_engine.calculate_evm_metrics(df, eac_method_index=1)
         self.assertEqual(m1["EAC"], 100)
         
+    def test_totals_skip_blank_costs(self):
+        # Blank cost / % cells count as 0 in the project totals.
+        df = pd.DataFrame([
+            {"planned_cost": 100, "actual_cost": 40, "remaining_cost": 60, "percent_complete": 50},
+            {"planned_cost": 200, "actual_cost": None, "remaining_cost": 200, "percent_complete": None},
+            {"planned_cost": None, "actual_cost": 10, "remaining_cost": None, "percent_complete": 100}
+        ])
+        m = evm_engine.calculate_evm_metrics(df, status_date="2023-01-09")
+        self.assertEqual(m["BAC"], 300)
+        self.assertEqual(m["AC"], 50)
+        self.assertEqual(m["EV"], 50)
+        self.assertEqual(m["PV"], 0) # No planned dates
+        self.assertEqual(m["EAC"], 310) # AC + remaining
+
+    def test_pv_before_and_after_all_tasks(self):
+        # 5-day task (1000) + 0-day weekend milestone (50).
+        df = pd.DataFrame([
+            {"planned_cost": 1000, "actual_cost": 0, "percent_complete": 0, "planned_start": "2023-01-02", "planned_finish": "2023-01-06"},
+            {"planned_cost": 50, "actual_cost": 0, "percent_complete": 0, "planned_start": "2023-01-07", "planned_finish": "2023-01-07"}
+        ])
+        before = evm_engine.calculate_evm_metrics(df, status_date="2022-12-30")
+        after = evm_engine.calculate_evm_metrics(df, status_date="2023-02-01")
+        self.assertEqual(before["PV"], 0)
+        self.assertEqual(after["PV"], 1000) # Milestone has no working days to elapse
+
     def test_div_zero(self):
         df = pd.DataFrame([{"planned_cost": 100, "actual_cost": 0, "percent_complete": 0}])
         m = evm_engine.calculate_evm_metrics(df)
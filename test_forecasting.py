@@ -48,6 +48,29 @@ class TestForecasting(unittest.TestCase):
         self.assertEqual(r1["task_created_delay"], 2) # No preds, so all created
         self.assertEqual(r1["delay_carried_in"], 0)
 
+    def test_forecast_frame_matches_dict(self):
+        # Task 2 has no schedule row -> default metrics.
+        df = pd.DataFrame([{
+            "activity_id": 1,
+            "actual_start": "2023-01-02",
+            "baseline_1_start": "2023-01-02",
+            "baseline_1_finish": "2023-01-06",
+            "ES_date": "2023-01-02",
+            "EF_date": "2023-01-06",
+            "planned_duration": 5
+        }])
+        G = nx.DiGraph()
+        G.add_edge(1, 2)
+        
+        res = forecasting_engine.calculate_forecasts(df, G)
+        frame = forecasting_engine.calculate_forecasts(df, G, as_frame=True)
+        
+        self.assertEqual(list(frame.columns), forecasting_engine.FORECAST_COLUMNS)
+        self.assertEqual(frame.loc[1, "forecast_finish_date"], "2023-01-06")
+        self.assertEqual(frame.loc[1, "remaining_duration_days"], 5)
+        self.assertIsNone(frame.loc[2, "forecast_start_date"])
+        self.assertEqual(frame.to_dict("index"), res)
+
     def test_delay_inheritance(self):
         # Task 1 (Pred) -> Late by 2 days.
         # Task 2 (Succ) -> Baseline Start follows Task 1.
@@ -65,6 +65,23 @@ class TestRecovery(unittest.TestCase):
         self.assertIn("last_change_type", ws.columns)
         self.assertIsNot(ws, self.df) # Deep copy
 
+    def test_init_downcast(self):
+        self.assertEqual(recovery_engine.init_recovery_workspace(self.df)["fte_allocation"].dtype, np.float64)
+        
+        ws = recovery_engine.init_recovery_workspace(self.df, downcast=True)
+        self.assertEqual(ws["fte_allocation"].dtype, np.float32)
+        self.assertEqual(ws["remaining_duration_days"].tolist(), [10.0])
+        self.assertEqual(self.df["remaining_duration_days"].dtype, np.int64) # Source untouched
+
+    def test_workspace_edits_leave_schedule_untouched(self):
+        original = self.df.copy(deep=True)
+        ws = recovery_engine.init_recovery_workspace(self.df)
+        actions = recovery_engine.generate_actions(self.df, {}, self.df_resource, self.root_causes)
+        self.assertTrue(actions)
+
+        recovery_engine.apply_actions(ws, actions, self.df_resource)
+        pd.testing.assert_frame_equal(self.df, original)
+
     def test_res_swap_logic(self):
         # A is critical, R1 costs 100
         # R2 costs 50, matches skills. Should appear.
@@ -130,6 +147,60 @@ class TestRecovery(unittest.TestCase):
         self.assertIn("Availability verified", narrative, "Narrative should mention availability verification")
         self.assertIn("preventing overallocation", narrative, "Narrative should mention preventing overallocation")
 
+    def test_res_swap_busy_check_skips_blank_dates(self):
+        # R2 has an undated task before its overlapping one; it must still count as busy
+        schedule = pd.DataFrame(self.df.to_dict("records") + [
+            {"activity_id": "B", "resource_id": "R2", "planned_start": None, "planned_finish": None},
+            {"activity_id": "C", "resource_id": "R2", "planned_start": "2024-01-05", "planned_finish": "2024-01-06"}
+        ])
+        
+        actions = recovery_engine.generate_actions(schedule, {}, self.df_resource, self.root_causes)
+        
+        swaps = [a for a in actions if a['type'] == recovery_engine.ACTION_RES_SWAP and a['activity_id'] == "A"]
+        self.assertEqual(swaps, [])
+
+    def test_actions_frame_matches_list(self):
+        actions = recovery_engine.generate_actions(self.df, {}, self.df_resource, self.root_causes)
+        frame = recovery_engine.generate_actions(self.df, {}, self.df_resource, self.root_causes, as_frame=True)
+        
+        self.assertEqual(list(frame.columns), recovery_engine.ACTION_COLUMNS)
+        self.assertEqual(frame["type"].tolist(), [a["type"] for a in actions])
+        self.assertEqual(frame["parameters"].tolist(), [a["parameters"] for a in actions])
+
+    def test_apply_action_with_position_map(self):
+        # Mixed int/str ids, duplicated id 2: the map must hit the same first row as the scan
+        ws = recovery_engine.init_recovery_workspace(pd.DataFrame({
+            "activity_id": [1, "2", 2], "is_deferred": [False, False, False]}))
+        act_pos = recovery_engine._activity_positions(ws)
+        action = {"id": "x", "type": recovery_engine.ACTION_DEFERRAL, "activity_id": 2, "parameters": {}}
+
+        success, _ = recovery_engine.apply_action(ws, action, act_pos=act_pos)
+        self.assertTrue(success)
+        self.assertEqual(ws["is_deferred"].tolist(), [False, True, False])
+
+        missing = dict(action, activity_id=9)
+        self.assertFalse(recovery_engine.apply_action(ws, missing, act_pos=act_pos)[0])
+
+    def test_fast_track_apply_matches_pred_id_literally(self):
+        # "." in the id must not match any character ("A11" is a different predecessor)
+        ws = recovery_engine.init_recovery_workspace(pd.DataFrame({
+            "activity_id": ["C"], "predecessor_id": ["A.1FS; A11"], "predecessors": ["A.1FS; A11"]}))
+        action = {"id": "x", "type": recovery_engine.ACTION_FAST_TRACK, "activity_id": "C",
+                  "parameters": {"related_pred_id": "A.1"}}
+
+        recovery_engine.apply_action(ws, action)
+        self.assertEqual(ws.at[0, "predecessor_id"], "A.1SS+2d; A11")
+        self.assertEqual(ws.at[0, "predecessors"], "A.1SS+2d; A11")
+
+    def test_apply_actions_matches_one_by_one(self):
+        actions = recovery_engine.generate_actions(self.df, {}, self.df_resource, self.root_causes)
+        one_by_one = recovery_engine.init_recovery_workspace(self.df)
+        expected = [recovery_engine.apply_action(one_by_one, a, self.df_resource) for a in actions]
+
+        bulk = recovery_engine.init_recovery_workspace(self.df)
+        self.assertEqual(recovery_engine.apply_actions(bulk, actions, self.df_resource), expected)
+        pd.testing.assert_frame_equal(bulk, one_by_one)
+
     def test_fte_logic(self):
         # Setup: Task A is critical, FTE 0.5 (in Setup it is 1.0, let's override)
         self.df.loc[0, "fte_allocation"] = 0.5
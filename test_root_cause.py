@@ -85,5 +85,22 @@ class TestRootCause(unittest.TestCase):
         row = results.loc["RISK_TASK"]
         self.assertEqual(row["Root Cause Category"], root_cause_engine.CAT_RISK)
 
+    def test_categorical_resource_ids(self):
+        # Same classification whether resource_id is plain or categorical (recovery workspace)
+        df = pd.DataFrame([
+            {"activity_id": "A", "resource_id": "R_OVER", "remaining_duration_days": 4},
+            {"activity_id": "B", "resource_id": "R_OK", "planned_cost": 100, "actual_cost": 300},
+            {"activity_id": "C", "resource_id": None, "planned_cost": 100, "actual_cost": 150}
+        ])
+        r_stats = {"R_OVER": {"overload_days_count": 2, "resource_name": "Alice"},
+                   "R_OK": {"overload_days_count": 0, "resource_name": "Bob"}}
+
+        plain = root_cause_engine.execute_root_cause_analysis(df, r_stats)
+        df["resource_id"] = df["resource_id"].astype("category")
+        categorical = root_cause_engine.execute_root_cause_analysis(df, r_stats)
+
+        pd.testing.assert_frame_equal(plain, categorical)
+        self.assertEqual(plain.set_index("Activity").loc["A", "Root Cause Category"], root_cause_engine.CAT_RES_OVERLOAD)
+
 if __name__ == '__main__':
     unittest.main()
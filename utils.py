@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import dateutil.parser
 
 # --- Constants ---
@@ -96,3 +97,40 @@ def validate_numeric(df, num_cols, filename):
     if len(errors) > 10:
         errors = errors[:10] + [f"... and {len(errors)-10} more numeric errors."]
     return errors
+
+# --- Normalization ---
+
+def normalize_activity_ids(df):
+    """
+    Casts activity_id to int64 once at load when every id is a whole number
+    (e.g. read as float or numeric strings), so downstream matching compares ints
+    instead of coercing per row. Columns with blank or non-numeric ids are left as-is
+    for the dependency validation to report.
+    """
+    if df is None or "activity_id" not in df.columns or df.empty:
+        return df
+    ids = pd.to_numeric(df["activity_id"], errors="coerce")
+    if ids.notna().all() and (ids == ids.round()).all():
+        df["activity_id"] = ids.astype("int64")
+    return df
+
+def parse_activity_ids(col):
+    """
+    Returns a list with int(activity_id) per row, or None where int() cannot
+    read the value. Integer and float columns are converted in one pass; other
+    columns (strings, mixed objects) fall back to int() per value.
+    """
+    if pd.api.types.is_integer_dtype(col) and not col.hasnans:
+        return col.astype("int64").tolist()
+    if pd.api.types.is_float_dtype(col):
+        values = col.to_numpy(dtype=float, na_value=np.nan)
+        valid = np.isfinite(values) & (np.abs(values) < 2**63)
+        ids = np.trunc(np.where(valid, values, 0)).astype("int64").tolist()
+        return [aid if ok else None for aid, ok in zip(ids, valid.tolist())]
+    ids = []
+    for value in col.tolist():
+        try:
+            ids.append(int(value))
+        except (ValueError, TypeError):
+            ids.append(None)
+    return ids